@@ -0,0 +1,50 @@
+import argparse
+import random
+import time
+
+from src.cgen.jinja_filters import j2_camel_case, j2_pascal_case, j2_snake_case
+
+#
+# Throughput of the case conversion filters, with a vocabulary of names
+# similar to a large definition (types, fields and enum values).
+# The uncached variant is measured as well.
+#
+
+
+def create_names(count: int, seed: int = 0) -> list[str]:
+    rnd = random.Random(seed)
+    words = ["config", "type", "value", "list", "entry", "name", "port", "host", "my", "x"]
+    separators = ["_", "-", " "]
+    names = []
+    for _ in range(count):
+        parts = rnd.sample(words, rnd.randint(1, 4))
+        names.append(rnd.choice(separators).join(parts) + str(rnd.randrange(100)))
+    return names
+
+
+def measure(function, names: list[str], calls: int) -> float:
+    start = time.perf_counter()
+    for idx in range(calls):
+        function(names[idx % len(names)])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Case conversion filter benchmark")
+    parser.add_argument("--names", type=int, default=2000, help="size of the vocabulary")
+    parser.add_argument("--calls", type=int, default=1000000)
+    args = parser.parse_args()
+
+    names = create_names(args.names)
+    print(f"{'filter':>12} {'cached/s':>12} {'uncached/s':>12}")
+    for function in [j2_camel_case, j2_pascal_case, j2_snake_case]:
+        function.cache_clear()
+        cached = measure(function, names, args.calls)
+        uncached = measure(function.__wrapped__, names, args.calls)
+        print(
+            f"{function.__name__[3:]:>12} {args.calls / cached:>12.0f} {args.calls / uncached:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import write_definition
+from src.cgen.cgen import load_model
+from src.cgen.spec_types import ObjectType
+
+#
+# Memory used by the loaded model (types, elements and doc entries).
+# The model memory is what is still allocated after loading, the peak memory
+# also includes the parsed definition and temporary data.
+#
+
+
+def measure(count: int, fields: int, depth: int, fanout: int) -> tuple[int, float, int, int]:
+    with tempfile.TemporaryDirectory() as tmp:
+        definition = write_definition(
+            os.path.join(tmp, "synthetic.yml"), types=count, fields=fields, depth=depth, fanout=fanout
+        )
+        tracemalloc.start()
+        start = time.perf_counter()
+        model = load_model(definition, "", validate_input=False)
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    object_fields = sum(len(t.fields) for t in model["types"] if isinstance(t, ObjectType))
+    object_fields += sum(len(e.fields) for e in model["elements"] if isinstance(e, ObjectType))
+    object_fields += len(model["config"].fields)
+    return object_fields, elapsed, current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model memory benchmark")
+    parser.add_argument("--types", type=int, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument("--fields", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fanout", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'types':>8} {'fields':>8} {'seconds':>10} {'model MB':>10} {'peak MB':>10} {'B/field':>10}")
+    for count in args.types:
+        object_fields, elapsed, current, peak = measure(count, args.fields, args.depth, args.fanout)
+        print(
+            f"{count:>8} {object_fields:>8} {elapsed:>10.3f} {current / 2**20:>10.1f} "
+            f"{peak / 2**20:>10.1f} {current / object_fields:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import resource
+import time
+import tracemalloc
+
+from benchmarks.synthetic import create_definition
+from src.cgen.cgen import extract_nested_types, load_types
+
+#
+# Scaling of the nested type extraction.
+# The time per type should stay roughly constant with a growing number of types.
+# The peak memory is measured in a second run, as tracing slows down allocations.
+#
+
+
+def measure(count: int, depth: int, variety: int) -> tuple[float, int]:
+    data = create_definition(types=count, depth=depth, variety=variety, fanout=0)
+
+    refs: dict = {}
+    types = load_types(data, "types", refs=refs)
+    elements = load_types(data, "elements", refs=refs)
+    start = time.perf_counter()
+    extract_nested_types(types, elements)
+    elapsed = time.perf_counter() - start
+
+    refs = {}
+    types = load_types(data, "types", refs=refs)
+    elements = load_types(data, "elements", refs=refs)
+    tracemalloc.start()
+    extract_nested_types(types, elements)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nested type extraction benchmark")
+    parser.add_argument(
+        "--types", type=int, nargs="+", default=[1000, 2000, 5000, 10000]
+    )
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--variety", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'types':>8} {'seconds':>10} {'us/type':>10} {'peak MB':>10}")
+    for count in args.types:
+        elapsed, peak = measure(count, args.depth, args.variety)
+        print(f"{count:>8} {elapsed:>10.3f} {elapsed / count * 1e6:>10.1f} {peak / 2**20:>10.1f}")
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"max RSS {rss / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_definition
+from src.cgen.__version__ import __version__
+from src.cgen.cgen import (
+    Loader,
+    assign_constraints,
+    create_config_type,
+    extract_nested_types,
+    filter_types,
+    find_schema_path,
+    load_model,
+    load_types,
+    render_template,
+    reorder_types,
+    sort_types,
+)
+from src.cgen.doc import create_render_data
+from src.cgen.spec_types import load_constraints
+
+#
+# Times every phase of the generator separately and prints the results as
+# JSON, to track the performance across releases. Every phase is executed
+# --repeat times, the best time is reported (in seconds). No caches are used.
+#
+
+PHASES = ["load", "validate", "types", "extract", "order", "constraints", "docs"]
+
+
+def measure_phases(definition: str, input_path: str) -> dict[str, float]:
+    # the validation result is memorized per process, forget it
+    cgen_module = sys.modules[Loader.__module__]
+    cgen_module._validated_definitions.clear()
+
+    times = {}
+
+    def phase(name: str, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        times[name] = time.perf_counter() - start
+        return result
+
+    loader = Loader()
+    loader.search_paths = ["definition", input_path]
+    phase("load", loader.load, definition)
+    phase("validate", loader._validate, find_schema_path("definition.schema.json"))
+
+    def load_all_types():
+        refs: dict = {}
+        return load_types(loader.data, "types", refs=refs), load_types(loader.data, "elements", refs=refs)
+
+    def order(types):
+        return reorder_types(filter_types(sort_types(types)))
+
+    def constraints(types, elements):
+        assign_constraints(types, elements, load_constraints(loader.data))
+
+    def docs(elements):
+        return create_render_data(create_config_type(elements).doc("config"))
+
+    types, elements = phase("types", load_all_types)
+    phase("extract", extract_nested_types, types, elements)
+    types = phase("order", order, types)
+    phase("constraints", constraints, types, elements)
+    phase("docs", docs, elements)
+    return times
+
+
+def measure_render(definition: str, input_path: str, template: str) -> float:
+    model = load_model(definition, input_path, validate_input=False)
+    with tempfile.TemporaryDirectory() as output_path:
+        start = time.perf_counter()
+        render_template(model, template, output_path)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator phase benchmark (JSON output)")
+    parser.add_argument("--definition", type=str, help="existing definition, default: synthetic")
+    parser.add_argument("--input", type=str, default="", help="input path")
+    parser.add_argument("--template", type=str, nargs="*", default=["xsd", "cpp-pugixml", "doc-markdown"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=str, help="output file, default: stdout")
+    # synthetic definition
+    parser.add_argument("--types", type=int, default=1000)
+    parser.add_argument("--fields", type=int, default=6)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fanout", type=int, default=2)
+    parser.add_argument("--enum-size", type=int, default=4)
+    parser.add_argument("--constraints", type=int, default=100)
+    parser.add_argument("--elements", type=int, default=10)
+    parser.add_argument("--variety", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.definition:
+            definition = args.definition
+            parameters = {"definition": args.definition}
+        else:
+            parameters = {
+                "types": args.types,
+                "fields": args.fields,
+                "depth": args.depth,
+                "fanout": args.fanout,
+                "enum_size": args.enum_size,
+                "constraints": args.constraints,
+                "elements": args.elements,
+                "variety": args.variety,
+                "seed": args.seed,
+            }
+            definition = write_definition(os.path.join(tmp, "synthetic.yml"), **parameters)
+
+        runs = [measure_phases(definition, args.input) for _ in range(args.repeat)]
+        phases = {name: min(run[name] for run in runs) for name in PHASES}
+        render = {
+            template: min(
+                measure_render(definition, args.input, template) for _ in range(args.repeat)
+            )
+            for template in args.template
+        }
+        model = load_model(definition, args.input, validate_input=False)
+
+    result = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "model": {"types": len(model["types"]), "elements": len(model["elements"])},
+        "phases": phases,
+        "render": render,
+        "total": sum(phases.values()) + sum(render.values()),
+    }
+    text = json.dumps(result, indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w") as stream:
+            stream.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import time
+
+from benchmarks.synthetic import create_definition
+from src.cgen.cgen import (
+    extract_nested_types,
+    filter_types,
+    load_types,
+    reorder_types,
+    sort_types,
+    type_dependencies,
+)
+
+#
+# Scaling of the type ordering (sort, filter, reorder).
+# The reorder step is also measured on the reversed order, where every
+# dependency has to be moved. The time per type and dependency should stay
+# roughly constant with a growing number of types.
+#
+
+
+def measure(count: int, depth: int, variety: int) -> tuple[int, float, float]:
+    data = create_definition(types=count, depth=depth, variety=variety, fanout=0)
+    refs: dict = {}
+    types = load_types(data, "types", refs=refs)
+    elements = load_types(data, "elements", refs=refs)
+    extract_nested_types(types, elements)
+
+    start = time.perf_counter()
+    ordered = reorder_types(filter_types(sort_types(types)))
+    elapsed = time.perf_counter() - start
+
+    reversed_ = ordered[::-1]
+    start = time.perf_counter()
+    reorder_types(reversed_)
+    elapsed_reversed = time.perf_counter() - start
+
+    edges = sum(len(type_dependencies(t)) for t in ordered)
+    return len(ordered) + edges, elapsed, elapsed_reversed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Type ordering benchmark")
+    parser.add_argument(
+        "--types", type=int, nargs="+", default=[1000, 2000, 5000, 10000]
+    )
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--variety", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'types':>8} {'nodes':>8} {'seconds':>10} {'reversed':>10} {'us/node':>10}")
+    for count in args.types:
+        nodes, elapsed, elapsed_reversed = measure(count, args.depth, args.variety)
+        print(
+            f"{count:>8} {nodes:>8} {elapsed:>10.3f} {elapsed_reversed:>10.3f} "
+            f"{(elapsed + elapsed_reversed) / nodes * 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import random
+
+import yaml
+
+#
+# Synthetic definition generator for benchmarks.
+#
+# All generated definitions are deterministic for a given set of parameters.
+#
+
+
+def create_definition(
+    types: int = 100,
+    fields: int = 6,
+    depth: int = 2,
+    fanout: int = 2,
+    enum_size: int = 4,
+    constraints: int = 0,
+    elements: int = 10,
+    variety: int = 16,
+    seed: int = 0,
+) -> dict:
+    # types       ... number of named types
+    # fields      ... number of scalar fields per object
+    # depth       ... nesting depth of inline objects and arrays
+    # fanout      ... number of $ref fields per type (to previously defined types)
+    # enum_size   ... number of values of enumerations
+    # constraints ... number of unique constraints
+    # elements    ... number of root elements
+    # variety     ... number of different inline object shapes
+    rnd = random.Random(seed)
+
+    def scalar(index: int) -> dict:
+        kind = index % 5
+        if kind == 0:
+            return {"type": "int", "min": 0, "max": 1000 + index % 7}
+        if kind == 1:
+            return {"type": "string", "pattern": "[a-z]+"}
+        if kind == 2:
+            return {"type": "double", "default": 0.5}
+        if kind == 3:
+            return {"type": "bool", "default": "false"}
+        return {"type": "string", "enum": [f"value{v}" for v in range(enum_size)]}
+
+    def inline(level: int, shape: int) -> dict:
+        properties = {f"v{shape}": {"type": "int"}, "name": {"type": "string"}}
+        if level > 1:
+            properties["inner"] = inline(level - 1, shape)
+            properties["list"] = {
+                "type": "array",
+                "items": inline(level - 1, (shape + 1) % variety),
+            }
+        return {"type": "object", "properties": properties, "required": ["name"]}
+
+    definition = {
+        "config-gen": 0.4,
+        "info": {"version": "1.0.0", "title": "synthetic"},
+        "options": {"cpp": {"namespaces": ["synthetic"], "use_optional": True}},
+        "elements": {},
+        "types": {},
+    }
+
+    for index in range(types):
+        properties = {f"s{f}": scalar(index + f) for f in range(fields)}
+        if depth > 0:
+            properties["nested"] = inline(depth, rnd.randrange(variety))
+            properties["dict"] = {
+                "type": "dict",
+                "keys": {"type": "string"},
+                "values": {"type": "int"},
+            }
+        for ref in range(min(fanout, index)):
+            target = rnd.randrange(index)
+            properties[f"r{ref}"] = {"$ref": f"#/types/type{target}"}
+        definition["types"][f"type{index}"] = {
+            "type": "object",
+            "description": f"Type {index}",
+            "properties": properties,
+            "required": ["s0"],
+        }
+
+    for index in range(min(elements, types)):
+        definition["elements"][f"element{index}"] = {
+            "$ref": f"#/types/type{types - 1 - index}",
+            "use": "required",
+        }
+
+    if constraints:
+        definition["constraints"] = [
+            {
+                "unique": None,
+                "id": f"unique{index}",
+                "scope": f"/element{index % max(1, min(elements, types))}",
+                "field": "s0",
+            }
+            for index in range(constraints)
+        ]
+
+    return definition
+
+
+def write_definition(path: str, **kwargs) -> str:
+    with open(path, "w") as stream:
+        yaml.safe_dump(create_definition(**kwargs), stream, sort_keys=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a synthetic definition")
+    parser.add_argument("output", type=str, help="output file")
+    parser.add_argument("--types", type=int, default=100)
+    parser.add_argument("--fields", type=int, default=6)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fanout", type=int, default=2)
+    parser.add_argument("--enum-size", type=int, default=4)
+    parser.add_argument("--constraints", type=int, default=0)
+    parser.add_argument("--elements", type=int, default=10)
+    parser.add_argument("--variety", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = vars(parser.parse_args())
+    write_definition(args.pop("output"), **args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import logging
 import sys
 
-from .cgen import cgen
+from .cgen import cgen, generate, load_model, render_template  # noqa: F401
 
 
 def main() -> None:
@@ -1,29 +1,44 @@
 import argparse
+import filecmp
 import glob
+import hashlib
+import json
 import logging
 import os
 import shutil
 import sys
+import tempfile
 import yaml
 
-from copy import deepcopy
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
 from jinja2 import (
+    BytecodeCache,
     Environment,
+    FileSystemBytecodeCache,
     FileSystemLoader,
     TemplateSyntaxError,
     TemplateError,
     ChainableUndefined,
 )
-from jsonschema import validate
 from pathlib import Path
 
 from .doc import create_render_data
+from .manifest import (
+    create_entry,
+    dump_manifest,
+    is_up_to_date,
+    load_manifest,
+    manifest_path,
+)
 from .jinja_filters import (
     j2_base,
     j2_camel_case,
     j2_debug_print,
     j2_pascal_case,
     j2_snake_case,
+    j2_sort_order,
     j2_str_to_dict,
     j2_title_case,
     j2_is_type,
@@ -38,40 +53,99 @@ from .spec_types import (
     is_equal_type
 )
 from .spec_types import Constraint
-from .spec_types import load_type, load_constraints
+from .spec_types import data_from_path, intern, load_type, load_constraints
 
 
 from .__version__ import __version__
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML without libyaml
+    from yaml import SafeLoader as YamlLoader
+
 #
 #
 #
 
 
+# compiled schema validators and hashes of successfully validated definitions,
+# both are kept for the lifetime of the process (e.g. in watch mode)
+_schema_validators: dict[str, object] = {}
+_validated_definitions: set[str] = set()
+
+
 class Loader:
-    def __init__(self):
+    def __init__(self, cache_path: str | None = None):
         self.data = dict()
         self.search_paths = []
+        self.files = []
+        self.cache_path = cache_path
+        self.report_all_errors = False
+        self._loading: list[str] = []
+        self._loaded: set[str] = set()
 
     def load(self, path: str, schema_path: str | None = None):
         self._load_yaml(path)
         if schema_path:
             self._validate(schema_path)
+            self.files.append(os.path.abspath(schema_path))
 
-    def _load_yaml(self, filepath: str):
+    def _find_yaml(self, filepath: str) -> str:
         paths = [filepath]
         [paths.append(os.path.join(sp, filepath)) for sp in self.search_paths]
         for path in paths:
-            try:
-                with open(path, "r") as stream:
-                    data = yaml.safe_load(stream)
-            except FileNotFoundError:
-                continue
-            self._load_references(data)
-            Loader.merge(data, self.data)
-            return
+            if os.path.isfile(path):
+                return os.path.abspath(path)
         raise FileNotFoundError(filepath)
 
+    def _load_yaml(self, filepath: str):
+        # every file is loaded and merged only once, no matter how often it is referenced
+        path = self._find_yaml(filepath)
+        if path in self._loading:
+            cycle = " -> ".join(self._loading[self._loading.index(path):] + [path])
+            raise ValueError(f"circular file reference: {cycle}")
+        if path in self._loaded:
+            return
+        self._loading.append(path)
+        data = self._parse_yaml(path)
+        self.files.append(path)
+        self._load_references(data)
+        Loader.merge(data, self.data)
+        self._loading.pop()
+        self._loaded.add(path)
+
+    def _parse_yaml(self, path: str):
+        # parsed documents are cached by content hash as JSON, if a cache path is set
+        with open(path, "rb") as stream:
+            if not self.cache_path:
+                return yaml.load(stream, Loader=YamlLoader)
+            digest = hashlib.sha256(stream.read()).hexdigest()
+            cache_file = os.path.join(self.cache_path, "definitions", f"{digest}.json")
+            try:
+                with open(cache_file, "r", encoding="utf-8") as cache_stream:
+                    return json.load(cache_stream)
+            except Exception:
+                pass
+            stream.seek(0)
+            data = yaml.load(stream, Loader=YamlLoader)
+        try:
+            text = json.dumps(data)
+            # YAML values without an exact JSON representation (e.g. dates or
+            # non-string keys) are not cached
+            if json.loads(text) != data:
+                return data
+        except (TypeError, ValueError):
+            return data
+        try:
+            create_path(os.path.dirname(cache_file))
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(cache_file))
+            with os.fdopen(fd, "w", encoding="utf-8") as cache_stream:
+                cache_stream.write(text)
+            os.replace(temp_path, cache_file)
+        except OSError as e:
+            logging.debug(f'could not cache "{path}": {e}')
+        return data
+
     def _load_references(self, data: dict):
         for key, value in data.items():
             if key == "$ref":
@@ -83,9 +157,59 @@ class Loader:
                 self._load_references(value)
 
     def _validate(self, schema_path: str):
-        with open(schema_path, "r") as stream:
-            schema = yaml.safe_load(stream)
-            validate(self.data, schema)
+        digest = self._definition_hash(schema_path)
+        marker = (
+            os.path.join(self.cache_path, "validated", digest) if self.cache_path else None
+        )
+        if digest in _validated_definitions or (marker and os.path.isfile(marker)):
+            logging.debug("definition already validated")
+            return
+
+        validator = Loader._schema_validator(schema_path)
+        if self.report_all_errors:
+            errors = sorted(validator.iter_errors(self.data), key=lambda e: list(e.absolute_path))
+            for error in errors:
+                location = "/".join(str(p) for p in error.absolute_path)
+                logging.error(f"validation error at /{location}: {error.message}")
+            if errors:
+                raise ValueError(f"definition has {len(errors)} validation error(s)")
+        else:
+            from jsonschema.exceptions import best_match
+
+            error = best_match(validator.iter_errors(self.data))
+            if error is not None:
+                raise error
+
+        _validated_definitions.add(digest)
+        if marker:
+            try:
+                create_path(os.path.dirname(marker))
+                Path(marker).touch()
+            except OSError as e:
+                logging.debug(f"could not record validation: {e}")
+
+    def _definition_hash(self, schema_path: str) -> str:
+        digest = hashlib.sha256()
+        for path in [schema_path, *self.files]:
+            with open(path, "rb") as stream:
+                digest.update(hashlib.sha256(stream.read()).digest())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _schema_validator(schema_path: str):
+        # only imported when needed, it is slow to load
+        from jsonschema.validators import validator_for
+
+        path = os.path.abspath(schema_path)
+        validator = _schema_validators.get(path)
+        if validator is None:
+            with open(path, "r") as stream:
+                schema = json.load(stream)
+            cls = validator_for(schema)
+            cls.check_schema(schema)
+            validator = cls(schema)
+            _schema_validators[path] = validator
+        return validator
 
     @staticmethod
     def merge(source: dict, destination: dict):
@@ -103,30 +227,69 @@ class Loader:
 #
 
 
+class TypeIndex:
+    # Name index over the list of (nested) types.
+    # is_equal_type() only matches types with the same name, so the name index
+    # is sufficient to find equal types without comparing against every type.
+
+    def __init__(self, types: list[Type]):
+        self.types = types
+        self.names: dict[str, list[Type]] = {}
+        self.counters: dict[tuple[str, int], int] = {}
+        for type in types:
+            self.names.setdefault(type.name, []).append(type)
+
+    def has_name(self, name: str) -> bool:
+        return name in self.names
+
+    def has_equal(self, type: Type) -> bool:
+        return any(is_equal_type(type, x) for x in self.names.get(type.name, []))
+
+    def append(self, type: Type) -> None:
+        self.types.append(type)
+        self.names.setdefault(type.name, []).append(type)
+
+    def rename(self, type: Type, name: str) -> None:
+        entries = self.names.get(type.name, [])
+        for idx, entry in enumerate(entries):
+            if entry is type:
+                entries.pop(idx)
+                if not entries:
+                    del self.names[type.name]
+                self.names.setdefault(name, []).append(type)
+                break
+        type.name = name
+
+
 def create_name_with_counter(
     name: str,
-    types: list[Type],
+    index: TypeIndex,
     counter: int = 0,
 ) -> str:
+    # names are never removed from the index, so the first free counter
+    # can only grow and the search continues where the last one stopped
+    key = (name, counter)
+    counter = index.counters.get(key, counter)
     while True:
         cname: str = f"{name}-{counter}"
-        if not any(x.name == cname for x in types):
+        if not index.has_name(cname):
+            index.counters[key] = counter
             return cname
         counter += 1
 
 
 def create_name_with_opt_counter(
     name: str,
-    types: list[Type],
+    index: TypeIndex,
 ) -> str:
-    if not any(x.name == name for x in types):
+    if not index.has_name(name):
         return name
-    return create_name_with_counter(name, types, counter=1)
+    return create_name_with_counter(name, index, counter=1)
 
 
 def create_name(
     outer_name: list[str],
-    types: list[Type],
+    index: TypeIndex,
     suffix: str | None = None,
 ) -> str:
     full_name: bool = False
@@ -137,12 +300,12 @@ def create_name(
         name = outer_name[-1]
     if append_suffix and suffix:
         name = name + suffix
-    return create_name_with_opt_counter(name, types)
+    return create_name_with_opt_counter(name, index)
 
 
 def create_name2(
     type: Type,
-    types: list[Type],
+    index: TypeIndex,
     merge_collection_types: bool,
 ) -> str:
     if isinstance(type, ArrayType):
@@ -155,7 +318,7 @@ def create_name2(
         name: str = f"{iname}_array"
         if merge_collection_types:
             return name
-        return create_name_with_opt_counter(name, types)
+        return create_name_with_opt_counter(name, index)
     if isinstance(type, DictionaryType):
         dt: DictionaryType = type
         kname: str = (
@@ -171,12 +334,17 @@ def create_name2(
         name: str = f"{kname}_{vname}_dict"
         if merge_collection_types:
             return name
-        return create_name_with_opt_counter(name, types)
-    return create_name([type.name], types, get_type_suffix(type))
+        return create_name_with_opt_counter(name, index)
+    return create_name([type.name], index, get_type_suffix(type))
 
 
 def clone_type(type: Type, type_name: str) -> Type:
-    clone = deepcopy(type)
+    # Shallow copy, the clone shares the subtree (fields, item, key and value
+    # types, xml) with the original. Nested types are extracted bottom up, so
+    # the subtree is final at this point and is never modified afterwards.
+    # Only the constraints are assigned per type and need an own list.
+    clone = copy(type)
+    clone.constraints = list(type.constraints)
     clone.name = type_name
     clone.alias = type_name
     clone.is_nested = True
@@ -186,16 +354,16 @@ def clone_type(type: Type, type_name: str) -> Type:
 def create_nested_type(
     outer_name: list[str],
     type: Type,
-    types: list[Type],
+    index: TypeIndex,
     suffix: str,
 ) -> None:
-    if any(is_equal_type(type, x) for x in types):
+    if index.has_equal(type):
         return
     merge_collection_types: bool = False  # this might be a problem if properties differ
-    type_name: str = create_name2(type, types, merge_collection_types)
-    if not any(x.name == type_name for x in types):
-        types.append(clone_type(type, type_name))
-    type.name = type_name
+    type_name: str = intern(create_name2(type, index, merge_collection_types))
+    if not index.has_name(type_name):
+        index.append(clone_type(type, type_name))
+    index.rename(type, type_name)
 
 
 def get_type_suffix(type: Type) -> str:
@@ -213,7 +381,7 @@ def get_type_suffix(type: Type) -> str:
 def extract_nested_types_from_type(
     outer_name: list[str],
     type: Type,
-    types: list[Type],
+    index: TypeIndex,
 ) -> None:
     if type.is_ref:
         return
@@ -221,44 +389,59 @@ def extract_nested_types_from_type(
     if isinstance(type, ObjectType):
         objtype: ObjectType = type
         for field in objtype.fields:
-            extract_nested_types_from_type(outer_name + [field.name], field.type, types)
+            extract_nested_types_from_type(outer_name + [field.name], field.type, index)
 
-    create_nested_type(outer_name, type, types, get_type_suffix(type))
+    create_nested_type(outer_name, type, index, get_type_suffix(type))
 
 
 def extract_nested_types(types: list[Type], elements: list[Type]) -> None:
+    index = TypeIndex(types)
     for type in types:
-        extract_nested_types_from_type([type.name], type, types)
+        extract_nested_types_from_type([type.name], type, index)
     for type in elements:
-        extract_nested_types_from_type([type.name], type, types)
+        extract_nested_types_from_type([type.name], type, index)
 
 
-def sort_type(types: list[Type], current: Type) -> list[Type]:
-    sorted_ = []
-    if isinstance(current, ArrayType):
-        sorted_.extend(sort_type(types, current.item_type))
-        # sorted.append(current)
-    elif isinstance(current, DictionaryType):
-        sorted_.extend(sort_type(types, current.key_type))
-        sorted_.extend(sort_type(types, current.value_type))
-    elif isinstance(current, ObjectType):
-        for field in current.fields:
-            sorted_.extend(sort_type(types, field.type))
-
-    for t in types:
-        if t.name != current.name:
-            continue
-        types.remove(t)
-        sorted_.append(t if current.is_ref else current)  # prefer non ref types
-
-    return sorted_
+def type_dependencies(type: Type) -> list[Type]:
+    if isinstance(type, ArrayType):
+        return [type.item_type]
+    if isinstance(type, DictionaryType):
+        return [type.key_type, type.value_type]
+    if isinstance(type, ObjectType):
+        return [field.type for field in type.fields]
+    return []
 
 
 def sort_types(types: list[Type]) -> list[Type]:
-    unsorted = types[:]
+    # Walks the type trees depth first, starting with the first type that was
+    # not yet visited. Every tree node claims the type with the same name,
+    # nested types are therefore placed before the types containing them.
+    # Non reference nodes are preferred over the types in the list.
+    # Subtrees can be shared (references, nested types), a node that was
+    # already visited cannot claim anything anymore and is skipped.
+    unsorted: dict[str, list[Type]] = {}
+    for type in types:
+        unsorted.setdefault(type.name, []).append(type)
+
     sorted_ = []
-    while len(unsorted) > 0:
-        sorted_.extend(sort_type(unsorted, unsorted[0]))
+    visited: set[int] = set()
+    for root in types:
+        if root.name not in unsorted or not any(t is root for t in unsorted[root.name]):
+            continue
+        stack: list[tuple[Type, bool]] = [(root, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if not expanded:
+                if id(current) in visited:
+                    continue
+                visited.add(id(current))
+                stack.append((current, True))
+                for dependency in reversed(type_dependencies(current)):
+                    stack.append((dependency, False))
+                continue
+            for t in unsorted.pop(current.name, []):
+                sorted_.append(t if current.is_ref else current)  # prefer non ref types
+
     return sorted_
 
 
@@ -274,60 +457,87 @@ def filter_types(types: list[Type]) -> list[Type]:
 
 
 def reorder_types(types: list[Type]) -> list[Type]:
-    def reorder_type(types: list[Type], typeA: Type, typeB: Type) -> bool:
-        def indexOf(types: list[Type], type: Type) -> int:
-            index = -1
-            for t in types:
-                index += 1
-                if type.name == t.name:
-                    return index
-            return -1
-
-        idxA = indexOf(types, typeA)
-        if idxA == -1:
-            # tbd: error
-            return False
-        idxB = indexOf(types, typeB)
-        if idxB == -1:
-            # tbd: error
-            return False
-        if idxB <= idxA:
-            # ok
-            return False
-        logging.debug(f"moving {typeB.name} from {idxB} to {idxA+1}")
-        types.pop(idxB)
-        types.insert(idxA, typeB)
-        return True
+    # Topological sort by name (depth first, iterative). Types keep their order
+    # unless a type they depend on comes later, in which case the dependency
+    # is moved in front of them. Circular dependencies are reported as error.
+    by_name: dict[str, Type] = {}
+    for type in types:
+        by_name.setdefault(type.name, type)
+
+    result: list[Type] = []
+    visiting: dict[str, None] = {}  # current path, insertion ordered
+    done: set[str] = set()
+
+    for type in types:
+        if type.name in done:
+            continue
+        stack: list[tuple[Type, Iterator[Type]]] = [(type, iter(type_dependencies(type)))]
+        visiting[type.name] = None
+        while stack:
+            current, pending = stack[-1]
+            dependency = next(pending, None)
+            if dependency is None:
+                stack.pop()
+                del visiting[current.name]
+                done.add(current.name)
+                result.append(current)
+                continue
+            dependency = by_name.get(dependency.name)
+            if dependency is None or dependency.name == current.name:
+                continue
+            if dependency.name in done:
+                continue
+            if dependency.name in visiting:
+                path = list(visiting)
+                cycle = path[path.index(dependency.name):] + [dependency.name]
+                raise ValueError(f"circular type dependency: {' -> '.join(cycle)}")
+            logging.debug(f"moving {dependency.name} in front of {current.name}")
+            stack.append((dependency, iter(type_dependencies(dependency))))
+            visiting[dependency.name] = None
 
-    result = types[:]
-    iteration = 0
-    while True:
-        iteration += 1
-        moves = 0
-        for type in types:
-            # check all composite types
-            if isinstance(type, ArrayType):
-                if reorder_type(result, type, type.item_type):
-                    moves += 1
-            if isinstance(type, DictionaryType):
-                if reorder_type(result, type, type.key_type):
-                    moves += 1
-                if reorder_type(result, type, type.value_type):
-                    moves += 1
-            if isinstance(type, ObjectType):
-                for field in type.fields:
-                    if reorder_type(result, type, field.type):
-                        moves += 1
-        logging.debug(f"iteration {iteration}, {moves} moves")
-        if moves == 0:
-            break
     return result
 
 
-def load_types(types_dict: dict, elem: str) -> list[Type]:
+def reachable_type_names(types_dict: dict) -> set[str]:
+    # Names of the listed types that can be reached from the elements through
+    # properties, items, keys, values and references. Works on the definition
+    # data, so the types that are not reachable are never loaded.
+    names: set[str] = set()
+    refs: set[str] = set()
+    stack: list = list(types_dict.get("elements", {}).values())
+    while stack:
+        props = stack.pop()
+        if not isinstance(props, dict):
+            continue
+        ref = props.get("$ref")
+        if isinstance(ref, str) and ref not in refs:
+            refs.add(ref)
+            path = ref.split("/")
+            if len(path) == 3 and path[:2] == ["#", "types"]:
+                names.add(path[2])
+            if path[0] == "#" and len(path) > 1:
+                try:
+                    stack.append(data_from_path(types_dict, path[1:])[1])
+                except (KeyError, TypeError):
+                    pass  # reported when the reference is loaded
+        for key in ["items", "keys", "values"]:
+            stack.append(props.get(key))
+        stack.extend((props.get("properties") or {}).values())
+    return names
+
+
+def load_types(
+    types_dict: dict, elem: str, names: set[str] | None = None, refs: dict | None = None
+) -> list[Type]:
+    # names: load only the types with these names, None loads all types
+    # refs: resolved $ref targets, pass the same dict for all loads of a definition
+    if refs is None:
+        refs = {}
     types = []
     for key, value in types_dict[elem].items():
-        t = load_type(types_dict, key, value)
+        if names is not None and key not in names:
+            continue
+        t = load_type(types_dict, key, value, refs)
         if t:
             types.append(t)
     return types
@@ -338,33 +548,65 @@ def assign_constraints(
     elements: list[Type],
     constraints: list[Constraint],
 ):
-    def find_elem(data: list[Type], path: str) -> Type | None:
-        name = path.split("/")[-1]
-        for x in data:
-            if x.name == name or x.alias == name:
-                return x
-        return None
+    # The scope is a path starting with an element, e.g. /element/field/field.
+    # Arrays and dictionaries are passed through to their item or value type.
+    # References are followed to the listed type, their subtree is shared.
+    # If the path cannot be resolved, the last path segment is looked up as
+    # element, or as field of an object type (the object type is the scope).
+    elements_by_name: dict[str, Type] = {}
+    for e in elements:
+        elements_by_name.setdefault(e.name, e)
+        elements_by_name.setdefault(e.alias, e)
+
+    types_by_name: dict[str, Type] = {}
+    types_by_field: dict[str, Type] = {}
+    for t in types:
+        types_by_name.setdefault(t.name, t)
+        if isinstance(t, ObjectType):
+            for f in t.fields:
+                types_by_field.setdefault(f.name, t)
+
+    fields_by_type: dict[int, dict[str, Type]] = {}
 
-    def find_type(data: list[Type], path: str) -> Type | None:
+    def find_field(type: Type, name: str) -> Type | None:
+        while True:
+            if type.is_ref:
+                type = types_by_name.get(type.name, type)
+            if isinstance(type, ObjectType):
+                fields = fields_by_type.get(id(type))
+                if fields is None:
+                    fields = {}
+                    for f in type.fields:
+                        fields.setdefault(f.name, f.type)
+                    fields_by_type[id(type)] = fields
+                return fields.get(name)
+            if isinstance(type, ArrayType):
+                if name == type.item_name:
+                    return type.item_type
+                type = type.item_type
+            elif isinstance(type, DictionaryType):
+                type = type.value_type
+            else:
+                return None
+
+    def find_scope(path: str) -> Type | None:
+        names = [name for name in path.split("/") if name]
+        if names:
+            scope = elements_by_name.get(names[0])
+            for name in names[1:]:
+                if scope is None:
+                    break
+                scope = find_field(scope, name)
+            if scope is not None:
+                return scope
         name = path.split("/")[-1]
-        for x in data:
-            if not isinstance(x, ObjectType):
-                continue
-            for f in x.fields:
-                if f.name == name:
-                    return x
-        return None
+        return elements_by_name.get(name) or types_by_field.get(name)
 
     for cst in constraints:
-        # find scope in data
-        elem = find_elem(elements, cst.scope)
-        if elem is None:
-            elem = find_type(types, cst.scope)
+        elem = find_scope(cst.scope)
         if elem is None:
             logging.warning(f'constraint scope "{cst.scope}" not found')
             continue
-        # find path in data ... TODO
-        # assign to scope object
         elem.constraints.append(cst)
 
 
@@ -379,7 +621,7 @@ TEMPLATE_DEFAULT_CONFIG = {"template": {"publish": []}}
 def load_template_config(path: str):
     try:
         with open(Path(path) / "template.yml", "r") as stream:
-            return yaml.safe_load(stream)
+            return yaml.load(stream, Loader=YamlLoader)
     except FileNotFoundError:
         return TEMPLATE_DEFAULT_CONFIG
 
@@ -389,14 +631,27 @@ def load_template_config(path: str):
 #
 
 
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
 def create_path(path: str):
     os.makedirs(path, exist_ok=True)
 
 
 def render(env: Environment, template_file: str, output_path: str, data):
     template = env.get_template(template_file + ".j2")
+
     try:
-        output = template.render(data)
+        prefix = data["options"]["output_prefix"]
+    except KeyError:
+        prefix = ""
+
+    output_file = os.path.join(output_path, prefix + os.path.basename(template_file))
+
+    # the output is streamed to the file, it is never held in memory as whole
+    try:
+        write_stream(output_file, template.generate(data))
     except TemplateSyntaxError as e:
         logging.error(f"Template syntax error ({e.filename}, {e.lineno}): {e.message}")
         raise
@@ -404,15 +659,43 @@ def render(env: Environment, template_file: str, output_path: str, data):
         logging.error(f"Template error: {e.message}")
         raise
 
+    return output_file
+
+
+def write_stream(path: str, chunks: Iterable[str]) -> bool:
+    # write to a temporary file next to the target and rename it,
+    # so readers never see a partially written file and a failure
+    # (e.g. a template error while rendering) leaves the target untouched
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory or None)
     try:
-        prefix = data["options"]["output_prefix"]
-    except KeyError:
-        prefix = ""
+        with os.fdopen(fd, "w") as stream:
+            for chunk in chunks:
+                stream.write(chunk)
+        # unchanged files are not touched, this keeps their modification time
+        # and avoids needless rebuilds of generated code
+        if os.path.isfile(path) and filecmp.cmp(temp_path, path, shallow=False):
+            logging.debug(f'"{path}" is unchanged')
+            os.unlink(temp_path)
+            return False
+        os.chmod(temp_path, 0o666 & ~UMASK)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return True
 
-    output_file = os.path.join(output_path, prefix + os.path.basename(template_file))
 
-    with open(output_file, "w") as stream:
-        stream.write(output)
+def write_file(path: str, content: str) -> bool:
+    return write_stream(path, [content])
+
+
+def copy_file(source_path: str, target_path: str) -> bool:
+    if os.path.isfile(target_path) and filecmp.cmp(source_path, target_path, shallow=False):
+        return False
+    create_path(os.path.dirname(target_path) or ".")
+    shutil.copy2(source_path, target_path)
+    return True
 
 
 #
@@ -420,139 +703,544 @@ def render(env: Environment, template_file: str, output_path: str, data):
 #
 
 
-def config_generator(
+def create_config_type(elements: list[Type]) -> ObjectType:
+    return ObjectType(
+        name="config",
+        type_="object",
+        description="Configuration",
+        fields=[
+            ObjectField(
+                e.alias,
+                e,
+                e.description,
+                getattr(e, "required", False),
+                getattr(e, "default", False),
+            )
+            for e in elements
+        ],
+    )
+
+
+def create_type_view(types: list[Type], names: set[str]) -> dict[str, list[Type]]:
+    # The types with unique names, bucketed by kind and in their original order,
+    # so templates can iterate over them without filtering.
+    view: dict[str, list[Type]] = {
+        "all": [],
+        "objects": [],
+        "enums": [],
+        "string_enums": [],
+        "arrays": [],
+        "dicts": [],
+    }
+    for t in types:
+        if t.name not in names:
+            continue
+        view["all"].append(t)
+        if t.type == "object":
+            view["objects"].append(t)
+        elif t.type == "enum":
+            view["enums"].append(t)
+            if t.base_type == "string":
+                view["string_enums"].append(t)
+        elif t.type == "array":
+            view["arrays"].append(t)
+        elif t.type == "dict":
+            view["dicts"].append(t)
+    return view
+
+
+def load_model(
     definition: str,
-    template_path: str,
-    output_path: str,
     input_path: str,
     validate_input: bool = True,
-) -> int:
+    cache_path: str | None = None,
+    report_all_errors: bool = False,
+    reachable_types: bool = False,
+) -> dict:
+    logging.info(f'loading definition "{definition}"')
+
+    schema_path: str | None = None
+    if validate_input:
+        schema_path = find_schema_path("definition.schema.json")
+        if not schema_path:
+            raise FileNotFoundError("schema path not found")
+
+    loader = Loader(cache_path)
+    loader.search_paths = ["definition", input_path]  # TODO: config
+    loader.report_all_errors = report_all_errors
+    loader.load(definition, schema_path)
+
+    names = reachable_type_names(loader.data) if reachable_types else None
+    refs: dict = {}
+    types = load_types(loader.data, "types", names, refs)
+    elements = load_types(loader.data, "elements", refs=refs)
+
+    extract_nested_types(types, elements)
+
+    types = sort_types(types)
+    types = filter_types(types)
+    types = reorder_types(types)
+
+    constraints = load_constraints(loader.data)
+    assign_constraints(types, elements, constraints)
+
+    render_data = dict()
+
     try:
-        logging.info(f'processing template "{template_path}"')
+        render_data["info"] = loader.data["info"]
+    except KeyError:
+        render_data["info"] = dict()
+    try:
+        render_data["options"] = loader.data["options"]
+    except KeyError:
+        render_data["options"] = dict()
+
+    render_data["definition"] = definition
+    render_data["sources"] = loader.files
+    render_data["types"] = types
+    render_data["elements"] = elements
 
-        full_template_path: str | None = find_template_path(template_path)
-        if not full_template_path:
-            raise FileNotFoundError("template path not found")
-        template_path = full_template_path
+    render_data["config"] = create_config_type(elements)
 
-        schema_path: str | None = None
-        if validate_input:
-            schema_path = find_schema_path("definition.schema.json")
-            if not schema_path:
-                raise FileNotFoundError("schema path not found")
+    type_names = set([t.name for t in types])
+    elem_names = set([e.name for e in elements])
 
-        loader = Loader()
-        loader.search_paths = ["definition", input_path]  # TODO: config
-        loader.load(definition, schema_path)
+    # sets, the templates check the membership of names over and over again
+    render_data["unique_elements"] = elem_names.difference(type_names)
+    render_data["unique_types"] = type_names.union(elem_names)
 
-        types = load_types(loader.data, "types")
-        elements = load_types(loader.data, "elements")
+    render_data["type_view"] = create_type_view(types, render_data["unique_types"])
+    render_data["element_view"] = create_type_view(elements, render_data["unique_elements"])
 
-        extract_nested_types(types, elements)
+    render_data["docs"] = create_render_data(render_data["config"].doc("config"))
 
-        types = sort_types(types)
-        types = filter_types(types)
-        types = reorder_types(types)
+    return render_data
 
-        constraints = load_constraints(loader.data)
-        assign_constraints(types, elements, constraints)
 
-        template_config = load_template_config(template_path)
+def prepare_template(template_path: str) -> tuple[str, dict, list[str]]:
+    full_template_path: str | None = find_template_path(template_path)
+    if not full_template_path:
+        raise FileNotFoundError("template path not found")
+    template_path = full_template_path
 
-        render_data = dict()
+    template_config = load_template_config(template_path)
 
+    template_paths: list[str] = [template_path]
+    try:
+        for dependency in template_config.get("template", {}).get("depends", []):
+            source = dependency.get("source", "")
+            if source:
+                source_path = Path(source)
+                if source_path.is_absolute():
+                    template_paths.append(str(source_path))
+                else:
+                    template_paths.append(str(Path(template_path) / source_path))
+    except Exception:
+        pass
+
+    logging.debug(f"Template paths: {template_paths}")
+
+    return template_path, template_config, template_paths
+
+
+class TrackingFileSystemLoader(FileSystemLoader):
+    # remembers all loaded template files (including extended and imported ones),
+    # they are the template dependencies of the generated files
+
+    def __init__(self, searchpath: list[str]):
+        super().__init__(searchpath)
+        self.files: set[str] = set()
+
+    def get_source(self, environment: Environment, template: str):
+        source, filename, uptodate = super().get_source(environment, template)
+        self.files.add(os.path.abspath(filename))
+        return source, filename, uptodate
+
+
+def create_environment(
+    template_paths: list[str],
+    cache_path: str | None = None,
+) -> Environment:
+    file_loader = TrackingFileSystemLoader(
+        template_paths
+    )  # [template_path, Path(template_path).parent])
+    env = Environment(
+        loader=file_loader,
+        undefined=ChainableUndefined,
+        bytecode_cache=create_bytecode_cache(cache_path),
+    )
+
+    env.filters["camel_case"] = j2_camel_case
+    env.filters["pascal_case"] = j2_pascal_case
+    env.filters["snake_case"] = j2_snake_case
+    env.filters["title_case"] = j2_title_case
+    env.filters["base"] = j2_base
+    env.filters["to_dict"] = j2_str_to_dict
+    env.filters["debug"] = j2_debug_print
+    env.filters["sort_order"] = j2_sort_order
+    env.tests["Type"] = j2_is_type
+
+    return env
+
+
+#
+# compiled templates (and parsed definitions, see Loader) are cached on disk,
+# template cache entries are validated against the checksum of the source
+#
+
+
+def default_cache_path() -> str:
+    base_path = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return str(Path(base_path) / "cgen")
+
+
+def create_bytecode_cache(cache_path: str | None) -> BytecodeCache | None:
+    if not cache_path:
+        return None
+    directory = os.path.join(cache_path, "jinja")
+    try:
+        create_path(directory)
+    except OSError as e:
+        logging.warning(f'template cache disabled, cannot create "{directory}": {e}')
+        return None
+    return FileSystemBytecodeCache(directory)
+
+
+def clear_cache(cache_path: str):
+    cache = create_bytecode_cache(cache_path)
+    if cache:
+        cache.clear()
+    shutil.rmtree(os.path.join(cache_path, "definitions"), ignore_errors=True)
+    shutil.rmtree(os.path.join(cache_path, "validated"), ignore_errors=True)
+    _validated_definitions.clear()
+
+
+def template_files(template_path: str) -> list[str]:
+    files = []
+    for file_path in glob.glob(os.path.join(os.getcwd(), template_path, "*.j2")):
+        file_name = os.path.splitext(os.path.basename(file_path))[0]
+        if not file_name.startswith("_"):
+            files.append(file_name)
+    return files
+
+
+def publish_template(
+    template_path: str,
+    template_config: dict,
+    output_path: str,
+) -> list[tuple[str, str]]:
+    published = []
+    for publish_path in template_config["template"]["publish"]:
+        if isinstance(publish_path, str):
+            source_path = Path(template_path) / Path(publish_path)
+            target_path = Path(output_path) / Path(publish_path)
+        else:
+            source_path = Path(template_path) / Path(publish_path["from"])
+            target_path = Path(output_path) / Path(publish_path["to"])
+        if os.path.isdir(source_path):
+            for root, _, names in os.walk(source_path):
+                for name in names:
+                    source_file = Path(root) / name
+                    target_file = target_path / source_file.relative_to(source_path)
+                    copy_file(str(source_file), str(target_file))
+                    published.append((str(source_file), str(target_file)))
+        else:
+            copy_file(str(source_path), str(target_path))
+            published.append((str(source_path), str(target_path)))
+    return published
+
+
+def template_config_files(template_path: str) -> list[str]:
+    config_file = Path(template_path) / "template.yml"
+    return [str(config_file.absolute())] if config_file.is_file() else []
+
+
+def render_template(
+    model: dict,
+    template_path: str,
+    output_path: str,
+    cache_path: str | None = None,
+) -> tuple[list[str], list[str]]:
+    # returns the generated files and the template files they depend on
+    logging.info(f'processing template "{template_path}"')
+
+    template_path, template_config, template_paths = prepare_template(template_path)
+    env = create_environment(template_paths, cache_path)
+
+    return render_with_environment(model, env, template_path, template_config, output_path)
+
+
+def render_with_environment(
+    model: dict,
+    env: Environment,
+    template_path: str,
+    template_config: dict,
+    output_path: str,
+) -> tuple[list[str], list[str]]:
+    create_path(output_path)
+
+    outputs = []
+    for file_name in template_files(template_path):
+        outputs.append(render(env, file_name, output_path, model))
+
+    published = publish_template(template_path, template_config, output_path)
+    outputs.extend(target for _, target in published)
+    dependencies = template_config_files(template_path)
+    dependencies.extend(sorted(env.loader.files))
+    dependencies.extend(source for source, _ in published)
+    return outputs, dependencies
+
+
+def render_templates(
+    model: dict,
+    templates: dict[str, str],
+    cache_path: str | None = None,
+) -> dict[str, tuple[list[str], list[str]] | None]:
+    results = {}
+    for template_path, output_path in templates.items():
         try:
-            render_data["info"] = loader.data["info"]
-        except KeyError:
-            render_data["info"] = dict()
+            results[template_path] = render_template(
+                model, template_path, output_path, cache_path
+            )
+        except TemplateSyntaxError as e:
+            logging.error(f"Template syntax error at {e.filename}:{e.lineno}:\n{e}")
+            results[template_path] = None
+        except Exception as e:
+            logging.error(f"Error: {e}")
+            results[template_path] = None
+    return results
+
+
+#
+# parallel rendering, every worker process receives the model once
+# and renders single (template, file) pairs
+#
+
+
+_worker_model: dict = {}
+_worker_cache_path: str | None = None
+_worker_environments: dict[tuple[str, ...], Environment] = {}
+
+
+def _init_worker(model: dict, cache_path: str | None):
+    global _worker_model, _worker_cache_path
+    _worker_model = model
+    _worker_cache_path = cache_path
+
+
+def _render_in_worker(template_paths: list[str], file_name: str, output_path: str):
+    key = tuple(template_paths)
+    env = _worker_environments.get(key)
+    if env is None:
+        env = create_environment(template_paths, _worker_cache_path)
+        _worker_environments[key] = env
+    output_file = render(env, file_name, output_path, _worker_model)
+    return output_file, sorted(env.loader.files)
+
+
+def render_templates_parallel(
+    model: dict,
+    templates: dict[str, str],
+    jobs: int,
+    cache_path: str | None = None,
+) -> dict[str, tuple[list[str], list[str]] | None]:
+    results = {}
+    prepared = []
+    for template_path, output_path in templates.items():
+        logging.info(f'processing template "{template_path}"')
         try:
-            render_data["options"] = loader.data["options"]
-        except KeyError:
-            render_data["options"] = dict()
-
-        render_data["definition"] = definition
-        render_data["types"] = types
-        render_data["elements"] = elements
-
-        render_data["config"] = ObjectType(
-            name="config",
-            type_="object",
-            description="Configuration",
-            fields=[
-                ObjectField(
-                    e.alias,
-                    e,
-                    e.description,
-                    getattr(e, "required", False),
-                    getattr(e, "default", False),
+            prepared.append(
+                (template_path, output_path, *prepare_template(template_path))
+            )
+            create_path(output_path)
+        except Exception as e:
+            logging.error(f"Error: {e}")
+            results[template_path] = None
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(model, cache_path)
+    ) as executor:
+        futures = [
+            [
+                executor.submit(_render_in_worker, template_paths, file_name, output_path)
+                for file_name in template_files(full_template_path)
+            ]
+            for _, output_path, full_template_path, _, template_paths in prepared
+        ]
+
+        for pending, (template_path, output_path, full_template_path, template_config, _) in zip(
+            futures, prepared
+        ):
+            try:
+                outputs = []
+                loaded = set()
+                for future in pending:
+                    output_file, files = future.result()
+                    outputs.append(output_file)
+                    loaded.update(files)
+                published = publish_template(
+                    full_template_path, template_config, output_path
                 )
-                for e in elements
-            ],
-        )
+                outputs.extend(target for _, target in published)
+                dependencies = template_config_files(full_template_path)
+                dependencies.extend(sorted(loaded))
+                dependencies.extend(source for source, _ in published)
+                results[template_path] = outputs, dependencies
+            except TemplateSyntaxError as e:
+                logging.error(f"Template syntax error at {e.filename}:{e.lineno}:\n{e}")
+                results[template_path] = None
+            except Exception as e:
+                logging.error(f"Error: {e}")
+                results[template_path] = None
+    return results
 
-        type_names = set([t.name for t in types])
-        elem_names = set([e.name for e in elements])
 
-        render_data["unique_elements"] = list(elem_names.difference(type_names))
-        render_data["unique_types"] = list(type_names.union(elem_names))
+#
+# incremental generation
+#
 
-        render_data["docs"] = create_render_data(render_data["config"].doc("config"))
 
-        template_paths: list[str] = [template_path]
+def outputs_up_to_date(
+    definition: str,
+    templates: dict[str, str],
+    input_path: str,
+    options: dict | None = None,
+) -> bool:
+    for template_path, output_path in templates.items():
+        entry = load_manifest(output_path).get("templates", {}).get(template_path)
+        if entry is None:
+            return False
         try:
-            for dependency in template_config.get("template", {}).get("depends", []):
-                source = dependency.get("source", "")
-                if source:
-                    source_path = Path(source)
-                    if source_path.is_absolute():
-                        template_paths.append(str(source_path))
-                    else:
-                        template_paths.append(str(Path(template_path) / source_path))
+            _, _, template_paths = prepare_template(template_path)
         except Exception:
-            pass
-
-        logging.debug(f"Template paths: {template_paths}")
-
-        file_loader = FileSystemLoader(
-            template_paths
-        )  # [template_path, Path(template_path).parent])
-        env = Environment(loader=file_loader, undefined=ChainableUndefined)
-
-        env.filters["camel_case"] = j2_camel_case
-        env.filters["pascal_case"] = j2_pascal_case
-        env.filters["snake_case"] = j2_snake_case
-        env.filters["title_case"] = j2_title_case
-        env.filters["base"] = j2_base
-        env.filters["to_dict"] = j2_str_to_dict
-        env.filters["debug"] = j2_debug_print
-        env.tests["Type"] = j2_is_type
-
-        create_path(output_path)
-
-        for file_path in glob.glob(os.path.join(os.getcwd(), template_path, "*.j2")):
-            file_name = os.path.splitext(os.path.basename(file_path))[0]
-            if not file_name.startswith("_"):
-                render(env, file_name, output_path, render_data)
-
-        for publish_path in template_config["template"]["publish"]:
-            if isinstance(publish_path, str):
-                source_path = Path(template_path) / Path(publish_path)
-                target_path = Path(output_path) / Path(publish_path)
-            else:
-                source_path = Path(template_path) / Path(publish_path["from"])
-                target_path = Path(output_path) / Path(publish_path["to"])
-            if os.path.isdir(source_path):
-                shutil.copytree(source_path, target_path, dirs_exist_ok=True)
-            else:
-                shutil.copy2(source_path, target_path)
+            return False
+        if not is_up_to_date(entry, definition, input_path, template_paths, options):
+            return False
+    return True
 
+
+def update_manifests(
+    model: dict,
+    templates: dict[str, str],
+    results: dict[str, tuple[list[str], list[str]] | None],
+    input_path: str,
+    options: dict | None = None,
+):
+    manifests: dict[str, dict] = {}
+    for template_path, output_path in templates.items():
+        manifest = manifests.setdefault(output_path, load_manifest(output_path))
+        entries = manifest.setdefault("templates", {})
+        result = results.get(template_path)
+        if result is None:
+            entries.pop(template_path, None)
+            continue
+        outputs, _ = result
+        _, _, template_paths = prepare_template(template_path)
+        entries[template_path] = create_entry(
+            model["definition"], input_path, model["sources"], template_paths, outputs, options
+        )
+    for output_path, manifest in manifests.items():
+        try:
+            create_path(output_path)
+            write_file(manifest_path(output_path), dump_manifest(manifest))
+        except OSError as e:
+            logging.warning(f'could not write manifest to "{output_path}": {e}')
+
+
+#
+# dependency file (make / ninja syntax) for build systems
+#
+
+
+def escape_depfile_path(path: str) -> str:
+    return path.replace(" ", "\\ ").replace("#", "\\#").replace("$", "$$")
+
+
+def write_depfile(
+    depfile: str,
+    model: dict,
+    results: dict[str, tuple[list[str], list[str]] | None],
+):
+    targets: dict[str, None] = {}
+    dependencies: dict[str, None] = dict.fromkeys(model["sources"])
+    for result in results.values():
+        if result is None:
+            continue
+        outputs, template_dependencies = result
+        targets.update(dict.fromkeys(os.path.abspath(o) for o in outputs))
+        dependencies.update(dict.fromkeys(os.path.abspath(d) for d in template_dependencies))
+    lines = [" ".join(escape_depfile_path(t) for t in targets) + ":"]
+    lines.extend(f"  {escape_depfile_path(d)}" for d in dependencies)
+    create_path(os.path.dirname(os.path.abspath(depfile)))
+    write_file(depfile, " \\\n".join(lines) + "\n")
+
+
+def generate(
+    definition: str,
+    templates: dict[str, str],
+    input_path: str = "",
+    validate_input: bool = True,
+    jobs: int = 1,
+    force: bool = False,
+    cache_path: str | None = None,
+    depfile: str | None = None,
+    report_all_errors: bool = False,
+    reachable_types: bool = False,
+) -> int:
+    # templates: template name (or path) -> output path
+    # jobs: number of render processes, 0 uses all cores
+    # force: generate even if the manifests report unchanged inputs and outputs
+    # cache_path: directory for compiled templates and parsed definitions,
+    #             None disables the cache
+    # depfile: path of a make / ninja dependency file to write
+    # report_all_errors: report all validation errors, not only the most relevant one
+    # reachable_types: only load the types that are used by the elements
+    options = {"reachable_types": reachable_types}  # options affecting the outputs
+    if depfile and not os.path.isfile(depfile):
+        force = True
+    if not force and outputs_up_to_date(definition, templates, input_path, options):
+        logging.info("outputs are up to date")
         return 0
 
-    except TemplateSyntaxError as e:
-        logging.error(f"Template syntax error at {e.filename}:{e.lineno}:\n{e}")
+    try:
+        model = load_model(
+            definition, input_path, validate_input, cache_path, report_all_errors, reachable_types
+        )
     except Exception as e:
         logging.error(f"Error: {e}")
-    return 1
+        return 1
+
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1:
+        results = render_templates_parallel(model, templates, jobs, cache_path)
+    else:
+        results = render_templates(model, templates, cache_path)
+
+    update_manifests(model, templates, results, input_path, options)
+
+    if not results:
+        return 1
+    if any(result is None for result in results.values()):
+        return 1
+
+    if depfile:
+        try:
+            write_depfile(depfile, model, results)
+        except OSError as e:
+            logging.error(f"Error: could not write depfile: {e}")
+            return 1
+    return 0
+
+
+def config_generator(
+    definition: str,
+    template_path: str,
+    output_path: str,
+    input_path: str,
+    validate_input: bool = True,
+) -> int:
+    return generate(definition, {template_path: output_path}, input_path, validate_input)
 
 
 def find_template_path(path: str) -> str | None:
@@ -589,6 +1277,16 @@ def find_schema_path(path: str) -> str | None:
     return None
 
 
+def non_negative_int(value: str) -> int:
+    try:
+        n = int(value)
+    except ValueError:
+        n = -1
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"invalid non-negative int value: '{value}'")
+    return n
+
+
 def cgen() -> int:
     parser = argparse.ArgumentParser(prog="cgen", description="Config generator")
     parser.add_argument(
@@ -599,7 +1297,8 @@ def cgen() -> int:
         "--template",
         type=str,
         nargs="+",
-        help="template path - default: xsd, cpp-xmlwrp",
+        help="template path, optionally with a custom output path (TEMPLATE=OUTPUT)"
+        " - default: xsd, cpp-xmlwrp",
         default=["xsd", "cpp-xmlwrp"],
     )
     parser.add_argument(
@@ -607,11 +1306,80 @@ def cgen() -> int:
     )
     parser.add_argument("--input", type=str, default="", help="input path")
     parser.add_argument("--no-validate", action="store_true", help="skip validation")
+    parser.add_argument(
+        "--all-errors", action="store_true", help="report all validation errors"
+    )
+    parser.add_argument(
+        "--reachable-types",
+        action="store_true",
+        help="only load the types that are used by the elements",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=non_negative_int,
+        default=1,
+        help="number of parallel render processes, 0 for all cores - default: 1",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="generate even if inputs and outputs are unchanged",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=default_cache_path(),
+        help="cache path for compiled templates and parsed definitions - default: %(default)s",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="disable the cache")
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="clear the cache before generating"
+    )
+    parser.add_argument(
+        "--depfile", type=str, help="write a make / ninja dependency file"
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="keep running and regenerate when the definition or templates change",
+    )
     args = parser.parse_args()
-    rv = [
-        config_generator(
-            args.definition, t, args.output, args.input, not args.no_validate
+    cache_path = None if args.no_cache else args.cache_dir
+    if args.clear_cache:
+        clear_cache(args.cache_dir)
+    templates = dict(parse_template_arg(t, args.output) for t in args.template)
+    if args.watch:
+        from .watch import watch  # the watch module depends on this one
+
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        return watch(
+            args.definition,
+            templates,
+            args.input,
+            not args.no_validate,
+            cache_path,
+            report_all_errors=args.all_errors,
+            reachable_types=args.reachable_types,
         )
-        for t in args.template
-    ]
-    return max(rv) if rv else 1
+    return generate(
+        args.definition,
+        templates,
+        args.input,
+        not args.no_validate,
+        args.jobs,
+        args.force,
+        cache_path,
+        args.depfile,
+        args.all_errors,
+        args.reachable_types,
+    )
+
+
+def parse_template_arg(arg: str, default_output: str) -> tuple[str, str]:
+    template, sep, output = arg.partition("=")
+    if not sep:
+        return template, default_output
+    return template, output
@@ -2,7 +2,7 @@ from typing import Union
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class DocEntry:
     xpath: str
     description: str
@@ -1,26 +1,35 @@
+import re
+
 from ast import literal_eval as ast_literal_eval
+from functools import lru_cache
 
 from .spec_types import Type
 
 
+# Names come from a finite vocabulary (types, fields, enum values) and are
+# converted over and over again by the templates, the results are cached.
+CASE_CACHE_SIZE = 8192
+
+CASE_SEPARATORS = re.compile(r"[ _-]")
+
+
 def case_input_split(input: str) -> list[str]:
-    sep_c = "_"
-    sep_l = [" ", "-"]
-    for sep in sep_l:
-        input = input.replace(sep, sep_c)
-    return input.split(sep_c)
+    return CASE_SEPARATORS.split(input)
 
 
+@lru_cache(maxsize=CASE_CACHE_SIZE)
 def j2_camel_case(input: str) -> str:
     first, *others = case_input_split(input)
     return "".join([first.lower(), *map(str.title, others)])
 
 
+@lru_cache(maxsize=CASE_CACHE_SIZE)
 def j2_pascal_case(input: str) -> str:
     parts = map(str.title, case_input_split(input))
     return "".join(parts)
 
 
+@lru_cache(maxsize=CASE_CACHE_SIZE)
 def j2_snake_case(input: str) -> str:
     parts = map(str.lower, case_input_split(input))
     return "_".join(parts)
@@ -44,6 +53,15 @@ def j2_base(input: str, base: int) -> str:
     return input
 
 
+def j2_sort_order(input: list, ignore_case: bool = False) -> list[int]:
+    # indices of the strings in the order of a strcmp based binary search,
+    # the case is ignored for ASCII letters only (like the C++ lookup)
+    keys = [str(value).encode() for value in input]
+    if ignore_case:
+        keys = [key.lower() for key in keys]
+    return sorted(range(len(keys)), key=keys.__getitem__)
+
+
 def j2_is_type(input):
     return isinstance(input, Type)
 
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+
+from .__version__ import __version__
+
+#
+# The manifest records the hashes of all inputs (definition, referenced files,
+# schema, template files) and outputs of a template run. If none of them
+# changed, the outputs do not need to be generated again.
+#
+
+MANIFEST_FILE = ".cgen-manifest.json"
+
+
+def hash_file(path: str) -> str | None:
+    try:
+        with open(path, "rb") as stream:
+            return hashlib.sha256(stream.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def hash_files(paths: list[str]) -> dict[str, str | None]:
+    return {path: hash_file(path) for path in paths}
+
+
+def list_template_files(template_paths: list[str]) -> list[str]:
+    files = set()
+    for template_path in template_paths:
+        for root, _, names in os.walk(template_path):
+            for name in names:
+                files.add(os.path.abspath(os.path.join(root, name)))
+    return sorted(files)
+
+
+def manifest_path(output_path: str) -> str:
+    return os.path.join(output_path, MANIFEST_FILE)
+
+
+def load_manifest(output_path: str) -> dict:
+    try:
+        with open(manifest_path(output_path), "r") as stream:
+            manifest = json.load(stream)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != __version__:
+        return {}
+    return manifest
+
+
+def dump_manifest(manifest: dict) -> str:
+    manifest["version"] = __version__
+    return json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+
+
+def create_entry(
+    definition: str,
+    input_path: str,
+    sources: list[str],
+    template_paths: list[str],
+    outputs: list[str],
+    options: dict | None = None,
+) -> dict:
+    return {
+        "definition": os.path.abspath(definition),
+        "input": input_path,
+        "options": options or {},
+        "sources": hash_files([os.path.abspath(s) for s in sources]),
+        "template_paths": [os.path.abspath(t) for t in template_paths],
+        "templates": hash_files(list_template_files(template_paths)),
+        "outputs": hash_files([os.path.abspath(o) for o in outputs]),
+    }
+
+
+def is_up_to_date(
+    entry: dict,
+    definition: str,
+    input_path: str,
+    template_paths: list[str],
+    options: dict | None = None,
+) -> bool:
+    try:
+        if entry["definition"] != os.path.abspath(definition):
+            return False
+        if entry["input"] != input_path:
+            return False
+        if entry.get("options", {}) != (options or {}):
+            return False
+        if entry["template_paths"] != [os.path.abspath(t) for t in template_paths]:
+            return False
+        for group in ["sources", "outputs"]:
+            for path, digest in entry[group].items():
+                if digest is None or hash_file(path) != digest:
+                    return False
+        return entry["templates"] == hash_files(list_template_files(template_paths))
+    except (KeyError, TypeError):
+        return False
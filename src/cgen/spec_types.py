@@ -1,9 +1,33 @@
 import logging
+import sys
+
+from copy import copy
 
 from .doc import DocEntry
 
+#
+# The type model uses __slots__ to keep large definitions small in memory.
+# Names, aliases and type tags are repeated a lot and therefore interned.
+#
+
+
+def intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
 
 class Type:
+    __slots__ = (
+        "name",
+        "type",
+        "description",
+        "alias",
+        "constraints",
+        "xml",
+        "is_ref",
+        "is_nested",
+        "required",
+    )
+
     def __init__(
         self,
         name: str,
@@ -11,10 +35,10 @@ class Type:
         description: str,
         xml: dict | None,
     ):
-        self.name = name
-        self.type = type_
+        self.name = intern(name)
+        self.type = intern(type_)
         self.description = description
-        self.alias = name
+        self.alias = self.name
         self.constraints = []
         self.xml = xml if xml else {}
         self.is_ref = False
@@ -30,6 +54,8 @@ class Type:
 
 
 class IntegerType(Type):
+    __slots__ = ("base", "default", "min", "max")
+
     def __init__(
         self,
         name: str,
@@ -69,6 +95,8 @@ class IntegerType(Type):
 
 
 class FloatingType(Type):
+    __slots__ = ("default", "min", "max")
+
     def __init__(
         self,
         name: str,
@@ -104,6 +132,8 @@ class FloatingType(Type):
 
 
 class BooleanType(Type):
+    __slots__ = ("default",)
+
     def __init__(
         self,
         name: str,
@@ -143,6 +173,8 @@ class BooleanType(Type):
 
 
 class StringType(Type):
+    __slots__ = ("default", "pattern", "min", "max")
+
     def __init__(
         self,
         name: str,
@@ -181,6 +213,8 @@ class StringType(Type):
 
 
 class EnumType(Type):
+    __slots__ = ("base_type", "enum", "default")
+
     def __init__(
         self,
         name: str,
@@ -217,6 +251,8 @@ class EnumType(Type):
 
 
 class ArrayType(Type):
+    __slots__ = ("item_type", "item_name", "default", "minsize", "maxsize")
+
     def __init__(
         self,
         name: str,
@@ -243,12 +279,12 @@ class ArrayType(Type):
             alias={self.alias}}}"""
 
     @staticmethod
-    def create(data: dict, name: str, props: dict, ttype: str):
+    def create(data: dict, name: str, props: dict, ttype: str, refs: dict):
         item_type: Type | None = None
         if "items" in props:
-            item_type = load_type(data, "items", props["items"])
+            item_type = load_type(data, "items", props["items"], refs)
         elif "$ref" in props:
-            item_type = load_ref_type(data, "items", props)
+            item_type = load_ref_type(data, "items", props, refs)
             # if item_type.type == 'object':          # aaaarrgghhh
             #     item_type.type = item_type.name
 
@@ -282,6 +318,8 @@ class ArrayType(Type):
 
 
 class DictionaryType(Type):
+    __slots__ = ("key_type", "value_type", "default")
+
     def __init__(
         self,
         name: str,
@@ -304,21 +342,21 @@ class DictionaryType(Type):
             alias={self.alias}}}"""
 
     @staticmethod
-    def create(data: dict, name: str, props: dict, ttype: str):
+    def create(data: dict, name: str, props: dict, ttype: str, refs: dict):
         key_type = None
         if "type" in props["keys"]:
-            key_type = load_type(data, "type", props["keys"])
+            key_type = load_type(data, "type", props["keys"], refs)
         elif "$ref" in props["keys"]:
-            key_type = load_ref_type(data, "keys", props["keys"])
+            key_type = load_ref_type(data, "keys", props["keys"], refs)
 
         if key_type is None:
             raise Exception(f"could not retrieve key type of '{name}'")
 
         value_type = None
         if "values" in props:
-            value_type = load_type(data, "values", props["values"])
+            value_type = load_type(data, "values", props["values"], refs)
         elif "$ref" in props:
-            value_type = load_ref_type(data, "values", props)
+            value_type = load_ref_type(data, "values", props, refs)
 
         if value_type is None:
             raise Exception(f"could not retrieve value type of '{name}'")
@@ -345,6 +383,8 @@ class DictionaryType(Type):
 
 
 class ObjectField:
+    __slots__ = ("name", "type", "description", "required", "default")
+
     def __init__(
         self,
         name: str,
@@ -353,7 +393,7 @@ class ObjectField:
         required: bool = False,
         default: bool = False,  # only used for objects
     ):
-        self.name = name
+        self.name = intern(name)
         self.type = type_
         self.description = description
         self.required = required
@@ -376,6 +416,8 @@ class ObjectField:
 
 
 class ObjectType(Type):
+    __slots__ = ("default", "fields")
+
     def __init__(
         self,
         name: str,
@@ -398,13 +440,13 @@ class ObjectType(Type):
             xml={self.xml}}}"""
 
     @staticmethod
-    def create(data: dict, name: str, props: dict, ttype: str):
+    def create(data: dict, name: str, props: dict, ttype: str, refs: dict):
         fields = []
         required_fields = props.get("required", [])
         xml = props.get("xml", None)
         if "properties" in props:
             for pkey, pval in props["properties"].items():
-                pt = load_type(data, pkey, pval)
+                pt = load_type(data, pkey, pval, refs)
                 if pt:
                     fields.append(
                         ObjectField(
@@ -437,9 +479,12 @@ def data_from_path(data: dict, path: list[str]):
     return data_from_path(data[key], path[1:])
 
 
-def load_type(data: dict, name: str, props: dict) -> Type | None:
+def load_type(data: dict, name: str, props: dict, refs: dict | None = None) -> Type | None:
+    # refs: resolved $ref targets, shared by all types loaded from data
+    if refs is None:
+        refs = {}
     try:
-        res = load_type_(data, name, props)
+        res = load_type_(data, name, props, refs)
         if not res:
             return None
         # res.required = props.get("required", False)  # deprecated
@@ -458,7 +503,7 @@ def load_type(data: dict, name: str, props: dict) -> Type | None:
         raise
 
 
-def load_type_(data: dict, name: str, props: dict) -> Type | None:
+def load_type_(data: dict, name: str, props: dict, refs: dict) -> Type | None:
     if "type" in props:
         if props["type"] in ["int", "integer", "number"]:
             if "enum" in props.keys():
@@ -485,30 +530,41 @@ def load_type_(data: dict, name: str, props: dict) -> Type | None:
                 return StringType.create(name, props, ttype="string")
 
         if props["type"] in ["array", "list"]:
-            return ArrayType.create(data, name, props, ttype="array")
+            return ArrayType.create(data, name, props, ttype="array", refs=refs)
 
         if props["type"] in ["dict", "dictionary", "map"]:
-            return DictionaryType.create(data, name, props, ttype="dict")
+            return DictionaryType.create(data, name, props, ttype="dict", refs=refs)
 
         if props["type"] in ["object"]:
-            return ObjectType.create(data, name, props, ttype="object")
+            return ObjectType.create(data, name, props, ttype="object", refs=refs)
 
     elif "$ref" in props:
-        return load_ref_type(data, name, props)
+        return load_ref_type(data, name, props, refs)
 
     return None
 
 
-def load_ref_type(data: dict, name: str, props: dict) -> Type | None:
-    # 1. find and load type from data
-    path = props["$ref"].split("/")
-    if path[0] != "#":
-        raise NotImplementedError("external references not supported")
-    key, value = data_from_path(data, path[1:])
-    t = load_type(data, key, value)
+def resolve_ref(data: dict, ref: str, refs: dict) -> Type | None:
+    # Every target is loaded only once per refs (one load of a definition),
+    # the references share it and only differ in their overrides.
+    if ref not in refs:
+        path = ref.split("/")
+        if path[0] != "#":
+            raise NotImplementedError("external references not supported")
+        key, value = data_from_path(data, path[1:])
+        refs[ref] = load_type(data, key, value, refs)
+    return refs[ref]
+
+
+def load_ref_type(data: dict, name: str, props: dict, refs: dict) -> Type | None:
+    # 1. find the (shared) type and create a shallow copy for this reference,
+    # the subtree of a referenced type is never modified
+    t = resolve_ref(data, props["$ref"], refs)
     if t is not None:
-        t.alias = name
+        t = copy(t)
+        t.alias = intern(name)
         t.is_ref = True
+        t.constraints = list(t.constraints)
 
     # 2. overwrite properties if present
     if isinstance(t, IntegerType):
@@ -565,6 +621,8 @@ def load_ref_type(data: dict, name: str, props: dict) -> Type | None:
 
 
 class Constraint:
+    __slots__ = ("type", "id", "scope")
+
     def __init__(self, typename: str, id_: str, scope: str):
         self.type = typename
         self.id = id_
@@ -572,12 +630,16 @@ class Constraint:
 
 
 class UniqueConstraint(Constraint):
+    __slots__ = ("field",)
+
     def __init__(self, id_: str, scope: str, field: str):
         super().__init__("unique", id_, scope)
         self.field = field
 
 
 class KeyRefConstraint(Constraint):
+    __slots__ = ("refer", "field")
+
     def __init__(self, id_: str, scope: str, refer: str, field: str):
         super().__init__("keyref", id_, scope)
         self.refer = refer
@@ -633,6 +695,8 @@ def load_constraint(data: dict) -> Constraint | None:
 #
 
 def is_equal_type(a: Type, b: Type) -> bool:
+    if a is b:  # shared subtrees
+        return True
     try:
         if a.name != b.name:
             return False
@@ -0,0 +1,151 @@
+import logging
+import os
+import time
+
+from jinja2 import Environment, TemplateSyntaxError
+
+from .cgen import (
+    create_environment,
+    find_template_path,
+    load_model,
+    prepare_template,
+    render_with_environment,
+    update_manifests,
+)
+from .manifest import list_template_files
+
+#
+# Watch mode, keeps the model and the template environments in memory and
+# regenerates the outputs when the definition or the templates change.
+# Changes are detected by polling the modification times of all inputs.
+#
+
+
+def snapshot(paths: list[str]) -> dict[str, int | None]:
+    result = {}
+    for path in paths:
+        try:
+            result[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            result[path] = None
+    return result
+
+
+class WatchedTemplate:
+    def __init__(self, template_path: str, output_path: str, cache_path: str | None):
+        self.name = template_path
+        self.output_path = output_path
+        self.cache_path = cache_path
+        self.template_path: str = ""
+        self.template_config: dict = {}
+        self.template_paths: list[str] = []
+        self.env: Environment | None = None
+        self.files: dict[str, int | None] = {}
+
+    def prepare(self):
+        self.template_path, self.template_config, self.template_paths = prepare_template(
+            self.name
+        )
+        self.env = create_environment(self.template_paths, self.cache_path)
+
+    def watched_paths(self) -> list[str]:
+        if self.template_paths:
+            return self.template_paths
+        # not prepared yet or prepare failed (e.g. broken template.yml),
+        # watch the template directory to retry when it is fixed
+        template_path = find_template_path(self.name)
+        return [template_path] if template_path else []
+
+    def changed_files(self) -> list[str]:
+        paths = self.watched_paths()
+        if not paths:
+            return []
+        current = snapshot(list_template_files(paths))
+        changed = [
+            path
+            for path in current.keys() | self.files.keys()
+            if current.get(path) != self.files.get(path)
+        ]
+        self.files = current
+        return changed
+
+    def render(self, model: dict) -> tuple[list[str], list[str]] | None:
+        try:
+            if self.env is None:
+                self.prepare()
+                self.files = snapshot(list_template_files(self.template_paths))
+            return render_with_environment(
+                model, self.env, self.template_path, self.template_config, self.output_path
+            )
+        except TemplateSyntaxError as e:
+            logging.error(f"Template syntax error at {e.filename}:{e.lineno}:\n{e}")
+        except Exception as e:
+            logging.error(f"Error: {e}")
+        return None
+
+
+def watch(
+    definition: str,
+    templates: dict[str, str],
+    input_path: str = "",
+    validate_input: bool = True,
+    cache_path: str | None = None,
+    interval: float = 0.5,
+    report_all_errors: bool = False,
+    reachable_types: bool = False,
+) -> int:
+    options = {"reachable_types": reachable_types}
+    watched = [WatchedTemplate(t, o, cache_path) for t, o in templates.items()]
+    model: dict | None = None
+    sources: dict[str, int | None] = {}
+
+    logging.info(f'watching "{definition}", press Ctrl+C to stop')
+
+    try:
+        while True:
+            start = time.perf_counter()
+
+            reload = model is None and not sources
+            if sources and snapshot(list(sources.keys())) != sources:
+                reload = True
+
+            pending = []
+            for template in watched:
+                changed = template.changed_files()
+                if not changed:
+                    continue
+                if any(os.path.basename(path) == "template.yml" for path in changed):
+                    template.env = None
+                pending.append(template)
+
+            if reload:
+                try:
+                    model = load_model(
+                        definition,
+                        input_path,
+                        validate_input,
+                        cache_path,
+                        report_all_errors,
+                        reachable_types,
+                    )
+                    sources = snapshot(model["sources"])
+                except Exception as e:
+                    logging.error(f"Error: {e}")
+                    model = None
+                    sources = snapshot(list(sources.keys()) or [os.path.abspath(definition)])
+                pending = watched
+
+            if model is not None and pending:
+                results = {t.name: t.render(model) for t in pending}
+                update_manifests(
+                    model, {t.name: t.output_path for t in pending}, results, input_path, options
+                )
+                elapsed = (time.perf_counter() - start) * 1000
+                names = ", ".join(t.name for t in pending)
+                failed = sum(1 for r in results.values() if r is None)
+                status = f"{failed} failed" if failed else "ok"
+                logging.info(f"regenerated {names} in {elapsed:.1f} ms ({status})")
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return 0
@@ -13,6 +13,15 @@
 // e.g. const char* to_string(const FooBar& v);
 //      bool from_string(const char* s, FooBar& v); // returns false on error
 //
+// Sorted lookup:
+// e.g. SORTED_ENUMS(FooBar, ENUMARGS(Foo, Bar), ENUMARGS("foo", "bar"), ENUMARGS(1, 0))
+//                                                                       --------------
+//                                    Indices of the strings in sorted (strcmp) order
+//
+//      from_string does a binary search instead of comparing every string,
+//      SORTED_ENUMS_NOCASE does the same but ignores the case (ASCII only),
+//      the indices have to be sorted by the lower case strings then.
+//
 // Stream operators:
 // e.g. FooBar fb;
 //      std::cin >> fb;  // sets the badbit of the input stream on error
@@ -42,6 +51,47 @@ namespace details {
     template<typename ...Args>
     constexpr std::size_t va_max_len(Args&&...) { return max_len<sizeof(Args)...>::value; }
 
+    inline int compare_nocase(const char* a, const char* b)
+    {
+        const auto lower = [](unsigned char c) { return (c >= 'A' && c <= 'Z') ? c + ('a' - 'A') : c; };
+        for (;; ++a, ++b)
+        {
+            const int ca = lower(static_cast<unsigned char>(*a));
+            const int cb = lower(static_cast<unsigned char>(*b));
+            if (ca != cb || ca == 0)
+            {
+                return ca - cb;
+            }
+        }
+    }
+
+    // binary search for s in strings, order holds the indices of the strings in sorted order
+    template<typename Strings, typename Order, typename Compare>
+    inline bool find_sorted(const char* s, const Strings& strings, const Order& order, Compare compare, std::size_t& index)
+    {
+        std::size_t first = 0;
+        std::size_t count = order.size();
+        while (count > 0)
+        {
+            const std::size_t step = count / 2;
+            if (compare(strings[order[first + step]], s) < 0)
+            {
+                first += step + 1;
+                count -= step + 1;
+            }
+            else
+            {
+                count = step;
+            }
+        }
+        if (first < order.size() && compare(strings[order[first]], s) == 0)
+        {
+            index = order[first];
+            return true;
+        }
+        return false;
+    }
+
 } // namespace details
 } // namespace enums
 } // namespace cmn
@@ -55,6 +105,41 @@ template<typename T> constexpr size_t enum_size() { return 0; }
 #define ENUMARGS(...) __VA_ARGS__
 
 #define ENUMS(NAME, VALUES, STRINGS)                                           \
+    ___ENUMS_TYPE(NAME, ENUMARGS(VALUES), ENUMARGS(STRINGS))                   \
+    inline bool from_string(const char* s, NAME& e) {                          \
+        for (size_t n = 0; n < enums::details::NAME::enum_size; n++) {         \
+            if (strcmp(s, enums::details::NAME::strings[n]) == 0) {            \
+                e = static_cast<NAME>(n); return true; } }                     \
+        e = static_cast<NAME>(enums::details::NAME::enum_size-1);              \
+        return false; }                                                        \
+    ___ENUMS_STREAMS(NAME)
+
+#define SORTED_ENUMS(NAME, VALUES, STRINGS, ORDER)                             \
+    ___SORTED_ENUMS(NAME, ENUMARGS(VALUES), ENUMARGS(STRINGS),                 \
+        ENUMARGS(ORDER), strcmp)
+
+#define SORTED_ENUMS_NOCASE(NAME, VALUES, STRINGS, ORDER)                      \
+    ___SORTED_ENUMS(NAME, ENUMARGS(VALUES), ENUMARGS(STRINGS),                 \
+        ENUMARGS(ORDER),                                                       \
+        ::cmn::enums::details::compare_nocase)
+
+#define ___SORTED_ENUMS(NAME, VALUES, STRINGS, ORDER, COMPARE)                 \
+    ___ENUMS_TYPE(NAME, ENUMARGS(VALUES), ENUMARGS(STRINGS))                   \
+    namespace enums{ namespace details { namespace NAME {                      \
+        constexpr std::array<                                                  \
+            std::size_t, ::cmn::enums::details::va_count(ORDER)                \
+        > order{ ORDER };                                                      \
+    }}}                                                                        \
+    inline bool from_string(const char* s, NAME& e) {                          \
+        std::size_t n = enums::details::NAME::enum_size-1;                     \
+        const bool found = ::cmn::enums::details::find_sorted(                 \
+            s, enums::details::NAME::strings, enums::details::NAME::order,     \
+            COMPARE, n);                                                       \
+        e = static_cast<NAME>(n);                                              \
+        return found; }                                                        \
+    ___ENUMS_STREAMS(NAME)
+
+#define ___ENUMS_TYPE(NAME, VALUES, STRINGS)                                   \
     namespace enums{ namespace details { namespace NAME {                      \
         typedef std::array<                                                    \
             char[::cmn::enums::details::va_max_len(___ENUM_STRINGS(STRINGS))], \
@@ -65,13 +150,9 @@ template<typename T> constexpr size_t enum_size() { return 0; }
     }}}                                                                        \
     enum class NAME { ___ENUM_VALUES(VALUES) };                                \
     inline const char* to_string(NAME e) {                                     \
-        return enums::details::NAME::strings[static_cast<size_t>(e)]; }        \
-    inline bool from_string(const char* s, NAME& e) {                          \
-        for (size_t n = 0; n < enums::details::NAME::enum_size; n++) {         \
-            if (strcmp(s, enums::details::NAME::strings[n]) == 0) {            \
-                e = static_cast<NAME>(n); return true; } }                     \
-        e = static_cast<NAME>(enums::details::NAME::enum_size-1);              \
-        return false; }                                                        \
+        return enums::details::NAME::strings[static_cast<size_t>(e)]; }
+
+#define ___ENUMS_STREAMS(NAME)                                                 \
     inline std::ostream& operator<<(std::ostream& s, NAME e) {                 \
         s << to_string(e); return s; }                                         \
     inline std::istream& operator>>(std::istream& s, NAME& e) {                \
@@ -79,6 +160,7 @@ template<typename T> constexpr size_t enum_size() { return 0; }
         if (!from_string(r.c_str(), e)) {                                      \
             s.setstate(std::ios_base::badbit); }                               \
         return s; }
+
 /*
     NOTE:
     I would love to have this, but then we cant create enums in namespaces.
@@ -1,66 +1,218 @@
 #pragma once
 
+#include <cctype>
+#include <cerrno>
+#include <charconv>
+#include <cstdlib>
 #include <stdexcept>
 #include <string>
+#include <string_view>
+#include <system_error>
+#include <type_traits>
 
-#include <string.h>
+namespace config {
 
-#ifdef WIN32
-#define strcasecmp(a,b) stricmp(a,b)
-#endif
+//
+// The parsers work on std::string_view, so attribute and element values can
+// be passed as const char* or std::string without copying them. Numbers are
+// parsed with std::from_chars, which does not depend on the locale and
+// reports values that do not fit into the target type.
+//
 
-namespace config {
+inline bool is_space(char c)
+{
+    return c == ' ' || c == '\t' || c == '\r' || c == '\n';
+}
+
+inline std::string_view trim(std::string_view s)
+{
+    while (!s.empty() && is_space(s.front()))
+    {
+        s.remove_prefix(1);
+    }
+    while (!s.empty() && is_space(s.back()))
+    {
+        s.remove_suffix(1);
+    }
+    return s;
+}
+
+[[noreturn]] inline void throw_parse_error(std::errc ec, std::string_view s)
+{
+    if (ec == std::errc::result_out_of_range)
+    {
+        throw std::out_of_range("value out of range: '" + std::string(s) + "'");
+    }
+    throw std::invalid_argument("invalid value: '" + std::string(s) + "'");
+}
+
+// strips a leading '+', which std::from_chars does not accept
+inline const char* skip_plus(const char* first, const char* last)
+{
+    if (last - first > 1 && first[0] == '+' && first[1] != '-')
+    {
+        return first + 1;
+    }
+    return first;
+}
+
+template<typename T>
+inline T parse_integer(std::string_view s, int base = 10)
+{
+    const auto v = trim(s);
+    const char* first = skip_plus(v.data(), v.data() + v.size());
+    const char* last = v.data() + v.size();
+
+    const bool hex_prefix = last - first > 2 && first[0] == '0' && (first[1] == 'x' || first[1] == 'X');
+    if (base == 0)
+    {
+        base = hex_prefix ? 16 : (last - first > 1 && first[0] == '0') ? 8 : 10;
+    }
+    if (base == 16 && hex_prefix)
+    {
+        first += 2;
+    }
+
+    T value{};
+    const auto [ptr, ec] = std::from_chars(first, last, value, base);
+    if (ec != std::errc{})
+    {
+        throw_parse_error(ec, s);
+    }
+    if (ptr != last)
+    {
+        throw_parse_error(std::errc::invalid_argument, s);
+    }
+    return value;
+}
+
+template<typename T>
+inline T parse_floating(std::string_view s)
+{
+    const auto v = trim(s);
+    const char* first = skip_plus(v.data(), v.data() + v.size());
+    const char* last = v.data() + v.size();
+
+    T value{};
+#if defined(__cpp_lib_to_chars)
+    const auto [ptr, ec] = std::from_chars(first, last, value);
+    if (ec != std::errc{})
+    {
+        throw_parse_error(ec, s);
+    }
+    if (ptr != last)
+    {
+        throw_parse_error(std::errc::invalid_argument, s);
+    }
+#else
+    // no floating point std::from_chars in this standard library
+    const std::string tmp(first, last);
+    char* end = nullptr;
+    errno = 0;
+    if constexpr (std::is_same_v<T, float>)
+    {
+        value = std::strtof(tmp.c_str(), &end);
+    }
+    else if constexpr (std::is_same_v<T, double>)
+    {
+        value = std::strtod(tmp.c_str(), &end);
+    }
+    else
+    {
+        value = std::strtold(tmp.c_str(), &end);
+    }
+    if (tmp.empty() || end != tmp.c_str() + tmp.size())
+    {
+        throw_parse_error(std::errc::invalid_argument, s);
+    }
+    if (errno == ERANGE)
+    {
+        throw_parse_error(std::errc::result_out_of_range, s);
+    }
+#endif
+    return value;
+}
 
-inline bool stob(const std::string& s)
+inline bool stob(std::string_view s)
 {
-    if (strcasecmp("true", s.c_str()) == 0)
+    const auto equals = [](std::string_view a, std::string_view b)
+    {
+        if (a.size() != b.size())
+        {
+            return false;
+        }
+        for (std::size_t i = 0; i < a.size(); ++i)
+        {
+            if (std::tolower(static_cast<unsigned char>(a[i])) != b[i])
+            {
+                return false;
+            }
+        }
+        return true;
+    };
+
+    const auto v = trim(s);
+    if (equals(v, "true"))
     {
         return true;
     }
-    if (strcasecmp("false", s.c_str()) == 0)
+    if (equals(v, "false"))
     {
         return false;
     }
-    throw std::invalid_argument("s");
+    throw_parse_error(std::errc::invalid_argument, s);
 }
 
-inline unsigned long long stohex(const std::string& s)
+inline unsigned long long stohex(std::string_view s)
 {
-    return std::stoull(s, 0, 16);
+    return parse_integer<unsigned long long>(s, 16);
 }
 
-template<typename T> T from_string(const std::string& s) { return T{}; }
-template<typename T> T from_string(const std::string& s, int b) { return T{}; }
-
-template<> std::string from_string<std::string>(const std::string& s) { return s; }
-
-template<> float from_string<float>(const std::string& s) { return std::stof(s); }
-template<> double from_string<double>(const std::string& s) { return std::stod(s); }
-template<> long double from_string<long double>(const std::string& s) { return std::stold(s); }
-template<> bool from_string<bool>(const std::string& s) { return stob(s); }
-
-template<> char from_string<char>(const std::string& s) { return std::stoi(s); }
-template<> short from_string<short>(const std::string& s) { return std::stoi(s); }
-template<> int from_string<int>(const std::string& s) { return std::stoi(s); }
-template<> long from_string<long>(const std::string& s) { return std::stol(s); }
-template<> long long from_string<long long>(const std::string& s) { return std::stoll(s); }
-
-template<> unsigned char from_string<unsigned char>(const std::string& s) { return std::stoul(s); }
-template<> unsigned short from_string<unsigned short>(const std::string& s) { return std::stoul(s); }
-template<> unsigned int from_string<unsigned int>(const std::string& s) { return std::stoul(s); }
-template<> unsigned long from_string<unsigned long>(const std::string& s) { return std::stoul(s); }
-template<> unsigned long long from_string<unsigned long long>(const std::string& s) { return std::stoull(s); }
-
-template<> char from_string<char>(const std::string& s, int base) { return std::stoi(s, 0, base); }
-template<> short from_string<short>(const std::string& s, int base) { return std::stoi(s, 0, base); }
-template<> int from_string<int>(const std::string& s, int base) { return std::stoi(s, 0, base); }
-template<> long from_string<long>(const std::string& s, int base) { return std::stol(s, 0, base); }
-template<> long long from_string<long long>(const std::string& s, int base) { return std::stoll(s, 0, base); }
-
-template<> unsigned char from_string<unsigned char>(const std::string& s, int base) { return std::stoul(s, 0, base); }
-template<> unsigned short from_string<unsigned short>(const std::string& s, int base) { return std::stoul(s, 0, base); }
-template<> unsigned int from_string<unsigned int>(const std::string& s, int base) { return std::stoul(s, 0, base); }
-template<> unsigned long from_string<unsigned long>(const std::string& s, int base) { return std::stoul(s, 0, base); }
-template<> unsigned long long from_string<unsigned long long>(const std::string& s, int base) { return std::stoull(s, 0, base); }
+// throws if value is not within [min, max], e.g. the bounds of an integer or floating type
+template<typename T>
+inline const T& check_range(const T& value, const T& min, const T& max)
+{
+    if (value < min || max < value)
+    {
+        throw std::out_of_range(
+            "value " + std::to_string(value) +
+            " out of range [" + std::to_string(min) + ", " + std::to_string(max) + "]");
+    }
+    return value;
+}
+
+template<typename T> T from_string(std::string_view s) { return T{}; }
+template<typename T> T from_string(std::string_view s, int b) { return T{}; }
+
+template<> inline std::string from_string<std::string>(std::string_view s) { return std::string(s); }
+
+template<> inline float from_string<float>(std::string_view s) { return parse_floating<float>(s); }
+template<> inline double from_string<double>(std::string_view s) { return parse_floating<double>(s); }
+template<> inline long double from_string<long double>(std::string_view s) { return parse_floating<long double>(s); }
+template<> inline bool from_string<bool>(std::string_view s) { return stob(s); }
+
+template<> inline char from_string<char>(std::string_view s) { return parse_integer<char>(s); }
+template<> inline short from_string<short>(std::string_view s) { return parse_integer<short>(s); }
+template<> inline int from_string<int>(std::string_view s) { return parse_integer<int>(s); }
+template<> inline long from_string<long>(std::string_view s) { return parse_integer<long>(s); }
+template<> inline long long from_string<long long>(std::string_view s) { return parse_integer<long long>(s); }
+
+template<> inline unsigned char from_string<unsigned char>(std::string_view s) { return parse_integer<unsigned char>(s); }
+template<> inline unsigned short from_string<unsigned short>(std::string_view s) { return parse_integer<unsigned short>(s); }
+template<> inline unsigned int from_string<unsigned int>(std::string_view s) { return parse_integer<unsigned int>(s); }
+template<> inline unsigned long from_string<unsigned long>(std::string_view s) { return parse_integer<unsigned long>(s); }
+template<> inline unsigned long long from_string<unsigned long long>(std::string_view s) { return parse_integer<unsigned long long>(s); }
+
+template<> inline char from_string<char>(std::string_view s, int base) { return parse_integer<char>(s, base); }
+template<> inline short from_string<short>(std::string_view s, int base) { return parse_integer<short>(s, base); }
+template<> inline int from_string<int>(std::string_view s, int base) { return parse_integer<int>(s, base); }
+template<> inline long from_string<long>(std::string_view s, int base) { return parse_integer<long>(s, base); }
+template<> inline long long from_string<long long>(std::string_view s, int base) { return parse_integer<long long>(s, base); }
+
+template<> inline unsigned char from_string<unsigned char>(std::string_view s, int base) { return parse_integer<unsigned char>(s, base); }
+template<> inline unsigned short from_string<unsigned short>(std::string_view s, int base) { return parse_integer<unsigned short>(s, base); }
+template<> inline unsigned int from_string<unsigned int>(std::string_view s, int base) { return parse_integer<unsigned int>(s, base); }
+template<> inline unsigned long from_string<unsigned long>(std::string_view s, int base) { return parse_integer<unsigned long>(s, base); }
+template<> inline unsigned long long from_string<unsigned long long>(std::string_view s, int base) { return parse_integer<unsigned long long>(s, base); }
 
 } // namespace config
@@ -0,0 +1,108 @@
+#include <chrono>
+#include <cstdio>
+#include <iostream>
+#include <random>
+#include <string>
+#include <vector>
+
+#include "from_string.hpp"
+
+//
+// Micro benchmark for the number parsers in from_string.hpp.
+//
+// The values are passed as const char*, like attribute and element values
+// from pugixml/libxml2. "stox" copies them into a std::string and parses
+// with std::stoi/stoul/stod, which is what from_string.hpp did before it
+// switched to std::from_chars.
+//
+// usage: bench_from_string [count] [repeat]
+//
+
+template<typename Fn>
+static double measure(const std::vector<const char*>& values, int repeat, Fn&& fn)
+{
+    double best = 0.0;
+    for (int r = 0; r < repeat; ++r)
+    {
+        const auto start = std::chrono::steady_clock::now();
+        for (const auto* value : values)
+        {
+            fn(value);
+        }
+        const auto stop = std::chrono::steady_clock::now();
+        const double ns = std::chrono::duration<double, std::nano>(stop - start).count() / values.size();
+        if (r == 0 || ns < best)
+        {
+            best = ns;
+        }
+    }
+    return best;
+}
+
+template<typename T, typename Old, typename New>
+static int run(
+    const char* name,
+    const std::vector<std::string>& strings,
+    int repeat,
+    Old&& old_fn,
+    New&& new_fn)
+{
+    std::vector<const char*> values;
+    values.reserve(strings.size());
+    for (const auto& s : strings)
+    {
+        values.push_back(s.c_str());
+    }
+
+    // both parsers have to agree before timing them
+    int errors = 0;
+    for (const auto* value : values)
+    {
+        if (old_fn(value) != new_fn(value))
+        {
+            std::cout << name << ": mismatch for '" << value << "'\n";
+            errors += 1;
+        }
+    }
+
+    volatile T sink{};
+    const double old_ns = measure(values, repeat, [&](const char* v) { sink = old_fn(v); });
+    const double new_ns = measure(values, repeat, [&](const char* v) { sink = new_fn(v); });
+
+    std::printf("%-8s stox %7.1f ns/value   from_chars %7.1f ns/value   %5.2fx\n",
+        name, old_ns, new_ns, old_ns / new_ns);
+    return errors;
+}
+
+int main(int argc, char** argv)
+{
+    const std::size_t count = argc > 1 ? std::stoul(argv[1]) : 200000;
+    const int repeat = argc > 2 ? std::stoi(argv[2]) : 5;
+
+    std::mt19937_64 rng{42};
+    std::vector<std::string> ints, hexes, doubles;
+    for (std::size_t i = 0; i < count; ++i)
+    {
+        ints.push_back(std::to_string(static_cast<int>(rng() % 2000001) - 1000000));
+
+        char buffer[32];
+        std::snprintf(buffer, sizeof(buffer), "%x", static_cast<unsigned int>(rng()));
+        hexes.push_back(buffer);
+
+        std::snprintf(buffer, sizeof(buffer), "%.17g", static_cast<double>(rng() % 1000000) / 997.0);
+        doubles.push_back(buffer);
+    }
+
+    int errors = 0;
+    errors += run<int>("int", ints, repeat,
+        [](const char* s) { return std::stoi(std::string(s)); },
+        [](const char* s) { return config::from_string<int>(s); });
+    errors += run<unsigned int>("hex", hexes, repeat,
+        [](const char* s) { return static_cast<unsigned int>(std::stoul(std::string(s), 0, 16)); },
+        [](const char* s) { return config::from_string<unsigned int>(s, 16); });
+    errors += run<double>("double", doubles, repeat,
+        [](const char* s) { return std::stod(std::string(s)); },
+        [](const char* s) { return config::from_string<double>(s); });
+
+    return errors;
+}
@@ -0,0 +1,103 @@
+#include <chrono>
+#include <cstdio>
+#include <fstream>
+#include <iostream>
+#include <sstream>
+#include <string>
+
+#include <sys/resource.h>
+
+#include "config.hpp"
+
+//
+// Load benchmark, built once for every JSON backend (cpp-json builds a
+// document, cpp-json-sax fills the configuration while parsing).
+//
+// The document is data/example.json with an_array, a_dictionary and
+// test43.bar grown to count entries each, plus an unknown element of the
+// same size that has to be skipped. Both builds create the same document,
+// so the difference of the peak memory is the memory used by the loader.
+//
+// usage: bench_load_<template> example.json [count] [repeat]
+//
+
+static std::string replace(
+    std::string text,
+    const std::string& from,
+    const std::string& to)
+{
+    const auto pos = text.find(from);
+    if (pos == std::string::npos)
+    {
+        throw std::runtime_error("'" + from + "' not found in the example");
+    }
+    return text.replace(pos, from.size(), to);
+}
+
+static std::string create_document(
+    const std::string& example,
+    std::size_t count)
+{
+    std::string array, dictionary, bar, unknown;
+    for (std::size_t i = 0; i < count; ++i)
+    {
+        const auto n = std::to_string(i);
+        const char* sep = i > 0 ? ", " : "";
+        array += sep + n;
+        dictionary += sep + ("\"" + n + "\": \"value " + n + "\"");
+        bar += sep + ("{ \"baz\": \"bar " + n + "\" }");
+        unknown += sep + ("{ \"id\": " + n + ", \"tags\": [\"a\", \"b\"] }");
+    }
+
+    auto text = replace(example, "\"an_array\": [0, 0]", "\"an_array\": [" + array + "]");
+    text = replace(text, "\"a_dictionary\": { \"0\": \"0\", \"1\": \"1\" }", "\"a_dictionary\": { " + dictionary + " }");
+    text = replace(text, "\"bar\": [", "\"bar\": [" + bar + ", ");
+    return replace(text, "\"an_integer\": 0,", "\"unknown\": [" + unknown + "],\n  \"an_integer\": 0,");
+}
+
+static long peak_rss_kb()
+{
+    struct rusage usage{};
+    getrusage(RUSAGE_SELF, &usage);
+    return usage.ru_maxrss;
+}
+
+int main(int argc, char** argv)
+{
+    if (argc < 2)
+    {
+        std::cerr << "usage: " << argv[0] << " example.json [count] [repeat]\n";
+        return 1;
+    }
+    const std::size_t count = argc > 2 ? std::stoul(argv[2]) : 200000;
+    const int repeat = argc > 3 ? std::stoi(argv[3]) : 5;
+
+    std::ifstream ifs{argv[1]};
+    std::stringstream example;
+    example << ifs.rdbuf();
+    const auto text = create_document(example.str(), count);
+
+    double best = 0.0;
+    for (int r = 0; r < repeat; ++r)
+    {
+        const auto start = std::chrono::steady_clock::now();
+        auto config = config::LoadConfigFromString(text);
+        const auto stop = std::chrono::steady_clock::now();
+
+        if (config->an_array.size() != count || config->test43.bar.size() != count + 2)
+        {
+            std::cerr << "unexpected result\n";
+            return 1;
+        }
+
+        const double ms = std::chrono::duration<double, std::milli>(stop - start).count();
+        if (r == 0 || ms < best)
+        {
+            best = ms;
+        }
+    }
+
+    std::printf("%zu bytes  load %8.1f ms  peak memory %ld kB\n",
+        text.size(), best, peak_rss_kb());
+    return 0;
+}
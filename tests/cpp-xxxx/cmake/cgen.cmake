@@ -9,14 +9,20 @@ function(cgen target template inputfile outputdir workdir)
 
   message(STATUS "running cgen for ${target}")
 
-  add_custom_target(
-    ${target}
-    ALL
-    COMMAND "${Python3_EXECUTABLE}" -m src.cgen --template "${template}" --output "${outputdir}" "${inputfile}"
+  add_custom_command(
+    OUTPUT "${outputdir}/config.cpp" "${outputdir}/config.hpp"
+    BYPRODUCTS "${outputdir}/enums.hpp" "${outputdir}/from_string.hpp"
+    COMMAND "${Python3_EXECUTABLE}" -m src.cgen --template "${template}" --output "${outputdir}" --depfile "${outputdir}/cgen.d" "${inputfile}"
     DEPENDS "${inputfile}"
-    BYPRODUCTS "${outputdir}/config.cpp" "${outputdir}/config.hpp"  # enums.hpp, from_string.hpp
+    DEPFILE "${outputdir}/cgen.d"
     WORKING_DIRECTORY "${workdir}"
     COMMENT "Generating '${template}' ..."
+  )
+
+  add_custom_target(
+    ${target}
+    ALL
+    DEPENDS "${outputdir}/config.cpp" "${outputdir}/config.hpp"
     SOURCES "${inputfile}"
   )
 endfunction()
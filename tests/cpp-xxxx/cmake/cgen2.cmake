@@ -15,12 +15,13 @@ function(create_xsd_resource_for_target target definition)
 
   add_custom_command(
     OUTPUT
-      config.xsd
+      "${target_dir}/config.xsd"
     COMMAND
       ${Python3_EXECUTABLE}
       -m src.cgen
       --template "xsd"
       --output="${target_dir}"
+      --depfile="${target_dir}/config.xsd.d"
       "${definition}"
     WORKING_DIRECTORY
       "${work_dir}"
@@ -28,11 +29,13 @@ function(create_xsd_resource_for_target target definition)
       "Generating schema file"
     DEPENDS
       "${definition}"
+    DEPFILE
+      "${target_dir}/config.xsd.d"
   )
 
   add_custom_target(
     ${target}-xsd-res-gen
-    DEPENDS config.xsd
+    DEPENDS "${target_dir}/config.xsd"
   )
 
   #
@@ -0,0 +1,32 @@
+#include <iostream>
+#include <string>
+#include "config.hpp"
+
+//
+// Loads a configuration and checks that it loads ("ok") or fails ("error").
+//
+// usage: unknown_keys file.xml ok|error
+//
+
+int main(int argc, char** argv)
+{
+    if (argc < 3)
+    {
+        std::cerr << "usage: " << argv[0] << " file.xml ok|error\n";
+        return 1;
+    }
+
+    const bool expect_error = std::string{argv[2]} == "error";
+
+    try
+    {
+        auto config = config::LoadConfig(argv[1]);
+        std::cout << "loaded, name: " << config->name << ", value: " << config->item.value << "\n";
+        return expect_error ? 1 : 0;
+    }
+    catch (const std::exception& ex)
+    {
+        std::cout << "error: " << ex.what() << "\n";
+        return expect_error ? 0 : 1;
+    }
+}